@@ -4,6 +4,17 @@ class_name RawExport
 const DEFAULT_MATERIAL_TYPE := "DEFAULT"
 const BASIC_MATERIAL_TYPE := "BASIC"
 const IMAGE_FILES_MATERIAL_TYPE := "IMAGE_FILES"
+const BINARY_MAGIC := "RXMB"
+const BINARY_VERSION := 2
+const BINARY_FILE_SUFFIX := ".rxmb"
+const COMPRESSED_FILE_SUFFIX := ".gcpf"
+const COMPRESSED_MAGIC := "GCPF"
+const PACK_MAGIC := "RXMP"
+const PACK_VERSION := 1
+const PACK_FILE_SUFFIX := ".rxmpack"
+const COMPONENT_TYPE_UINT32 := 5125
+const COMPONENT_TYPE_FLOAT32 := 5126
+const SNORM16_MAX := 32767.0
 
 
 static func convert_array_to_color(p_array: Array) -> Color:
@@ -12,7 +23,9 @@ static func convert_array_to_color(p_array: Array) -> Color:
 	return Color(p_array[0], p_array[1], p_array[2], p_array[3])
 
 
-static func convert_array_to_packed_vector3_array(p_array: Array) -> PackedVector3Array:
+static func convert_array_to_packed_vector3_array(p_array) -> PackedVector3Array:
+	if p_array is PackedVector3Array:
+		return p_array
 	var packed_vector3_array = PackedVector3Array()
 	for element in p_array:
 		if not element is Vector3 and not len(element) == 3:
@@ -21,7 +34,9 @@ static func convert_array_to_packed_vector3_array(p_array: Array) -> PackedVecto
 	return packed_vector3_array
 	
 	
-static func convert_array_to_packed_vector2_array(p_array: Array) -> PackedVector2Array:
+static func convert_array_to_packed_vector2_array(p_array) -> PackedVector2Array:
+	if p_array is PackedVector2Array:
+		return p_array
 	var packed_vector3_array = PackedVector2Array()
 	for element in p_array:
 		if not element is Vector2 and not len(element) == 2:
@@ -127,9 +142,22 @@ class RawObjectData extends JsonSerializable:
 	var vertices: PackedVector3Array
 	var normals: PackedVector3Array
 	var uvs: PackedVector2Array
+	## 4 floats per vertex, as `Mesh.ARRAY_TANGENT` takes them: the tangent
+	## and the sign of the bitangent. Empty unless the export included
+	## tangents (objects whose materials use a normal map).
+	var tangents: PackedFloat32Array
 	var indices: PackedInt32Array
 	var material_indices: PackedInt64Array
 	var material_data: Array[MaterialData]
+	# Bounds in the object's local space, in Blender's coordinates.
+	var aabb: AABB
+	var bounding_sphere_center: Vector3
+	var bounding_sphere_radius: float
+	## One per material, faces and vertices of each in one range:
+	## {"material_index", "face_start", "face_count", "vertex_start",
+	## "vertex_count", "aabb": AABB, "bounding_sphere_center": Vector3,
+	## "bounding_sphere_radius": float}
+	var submeshes: Array[Dictionary]
 	
 	func _init(
 		p_vertices := PackedVector3Array(),
@@ -157,32 +185,374 @@ class RawObjectData extends JsonSerializable:
 			"vertices": vertices,
 			"normals": normals,
 			"uvs": uvs,
+			"tangents": tangents,
 			"indices": indices,
 			"material_indices": material_indices,
 			"material_data": serialized_material_data
 		}
 
 
-static func RawObjectData_from_json(p_json_string: String) -> RawObjectData:
-	var obj: Dictionary = JSON.parse_string(p_json_string)
-	
+static func MaterialData_array_from_dicts(p_dicts: Array) -> Array[MaterialData]:
 	var material_data: Array[MaterialData] = []
-	for material in obj.materials:
+	for material in p_dicts:
 		if material.type == DEFAULT_MATERIAL_TYPE:
 			material_data.append(DefaultMaterialData_from_dict(material))
 		elif material.type == BASIC_MATERIAL_TYPE:
 			material_data.append(BasicMaterialData_from_dict(material))
 		elif material.type == IMAGE_FILES_MATERIAL_TYPE:
 			material_data.append(ImageTextureMaterialData_from_dict(material))
+	return material_data
+
+
+static func AABB_from_dict(p_dict: Dictionary) -> AABB:
+	var minimum := Vector3(p_dict.min[0], p_dict.min[1], p_dict.min[2])
+	var maximum := Vector3(p_dict.max[0], p_dict.max[1], p_dict.max[2])
+	return AABB(minimum, maximum - minimum)
+	
+	
+static func Vector3_from_array(p_array: Array) -> Vector3:
+	return Vector3(p_array[0], p_array[1], p_array[2])
+	
+	
+## Sets the bounds and submeshes of `p_obj` from a file's JSON, or header,
+## if it has them (older exports don't).
+static func set_RawObjectData_bounds(p_obj: RawObjectData, p_dict: Dictionary) -> RawObjectData:
+	if not p_dict.has("aabb"):
+		return p_obj
+	p_obj.aabb = AABB_from_dict(p_dict.aabb)
+	p_obj.bounding_sphere_center = Vector3_from_array(p_dict.bounding_sphere.center)
+	p_obj.bounding_sphere_radius = p_dict.bounding_sphere.radius
+	for submesh in p_dict.submeshes:
+		p_obj.submeshes.append({
+			"material_index": int(submesh.material_index),
+			"face_start": int(submesh.face_start),
+			"face_count": int(submesh.face_count),
+			"vertex_start": int(submesh.vertex_start),
+			"vertex_count": int(submesh.vertex_count),
+			"aabb": AABB_from_dict(submesh.aabb),
+			"bounding_sphere_center": Vector3_from_array(submesh.bounding_sphere.center),
+			"bounding_sphere_radius": float(submesh.bounding_sphere.radius),
+		})
+	return p_obj
+	
+	
+static func RawObjectData_from_json(p_json_string: String) -> RawObjectData:
+	var obj: Dictionary = JSON.parse_string(p_json_string)
 	
-	return RawObjectData.new(
+	if obj.has("buffers"):
+		push_error(
+			"This is the header of a binary export, use "
+			+ "`RawObjectData_from_file` to load it along with its buffer."
+		)
+		
+	var raw_object_data := set_RawObjectData_bounds(RawObjectData.new(
 		RawExport.convert_array_to_packed_vector3_array(obj.vertices),
 		RawExport.convert_array_to_packed_vector3_array(obj.normals),
 		RawExport.convert_array_to_packed_vector2_array(obj.uvs),
 		obj.indices,
 		obj.material_indices,
-		material_data
+		MaterialData_array_from_dicts(obj.materials)
+	), obj)
+	if obj.has("tangents"):
+		for tangent in obj.tangents:
+			raw_object_data.tangents.append_array(PackedFloat32Array(tangent))
+	return raw_object_data
+
+
+## A pack written by the Blender addon: the files of many objects in one,
+## each read with random access through the same open file. Files are
+## named by their path relative to the export directory, e.g.
+## "windows/window.rxmb"; pass the pack to `RawObjectData_from_file` to
+## load one.
+class RawPack extends RefCounted:
+	var path: String
+	## Name -> {"offset", "length", "format", "compressed"}.
+	var entries: Dictionary
+	var _file: FileAccess
+	
+	func _init(p_path: String):
+		path = p_path
+		_file = FileAccess.open(p_path, FileAccess.READ)
+		if _file == null:
+			push_error(
+				"Failed to open pack '%s': %s."
+				% [p_path, error_string(FileAccess.get_open_error())]
+			)
+			return
+		if _file.get_buffer(4).get_string_from_ascii() != PACK_MAGIC:
+			push_error("Not a raw export pack (magic mismatch): %s" % p_path)
+			return
+		var version := _file.get_32()
+		if version > PACK_VERSION:
+			push_error("Unsupported raw export pack version: %s" % version)
+			return
+		var index_length := _file.get_32()
+		_file.get_32() # Alignment of the entries.
+		var index = JSON.parse_string(_file.get_buffer(index_length).get_string_from_utf8())
+		if index is Dictionary:
+			entries = index.entries
+			
+	func has_file(p_name: String) -> bool:
+		return entries.has(p_name.simplify_path())
+		
+	## The contents of the file named `p_name`, decompressed if it was
+	## compressed.
+	func get_file_bytes(p_name: String) -> PackedByteArray:
+		var entry_name := p_name.simplify_path()
+		if not entries.has(entry_name):
+			push_error("No file '%s' in pack '%s'." % [entry_name, path])
+			return PackedByteArray()
+		var entry: Dictionary = entries[entry_name]
+		_file.seek(int(entry.offset))
+		var bytes := _file.get_buffer(int(entry.length))
+		if entry.compressed:
+			return RawExport.get_decompressed_bytes(bytes)
+		return bytes
+		
+		
+## Decompresses the contents of a file in the format of
+## `FileAccessCompressed` (`.gcpf`), for files not read from the file system.
+static func get_decompressed_bytes(p_bytes: PackedByteArray) -> PackedByteArray:
+	if p_bytes.slice(0, 4).get_string_from_ascii() != COMPRESSED_MAGIC:
+		push_error("Not a compressed file (magic mismatch).")
+		return PackedByteArray()
+	var mode := p_bytes.decode_u32(4)
+	var block_size := p_bytes.decode_u32(8)
+	var uncompressed_size := p_bytes.decode_u32(12)
+	var block_count := uncompressed_size / block_size + 1
+	var block_start := 16 + 4 * block_count
+	var decompressed := PackedByteArray()
+	for i_block in range(block_count):
+		var compressed_size := p_bytes.decode_u32(16 + 4 * i_block)
+		var decompressed_size := mini(block_size, uncompressed_size - i_block * block_size)
+		if decompressed_size > 0:
+			decompressed.append_array(
+				p_bytes.slice(block_start, block_start + compressed_size)
+					.decompress(decompressed_size, mode)
+			)
+		block_start += compressed_size
+	return decompressed
+	
+	
+## The contents of a file written by the Blender addon, decompressed if it
+## was compressed (`.gcpf`). With `p_pack`, `p_path` names a file in it.
+static func get_file_bytes(p_path: String, p_pack: RawPack = null) -> PackedByteArray:
+	if p_pack != null:
+		return p_pack.get_file_bytes(p_path)
+	if not p_path.ends_with(COMPRESSED_FILE_SUFFIX):
+		return FileAccess.get_file_as_bytes(p_path)
+		
+	# The compression mode is read from the file.
+	var file := FileAccess.open_compressed(p_path, FileAccess.READ)
+	if file == null:
+		push_error(
+			"Failed to open compressed file '%s': %s."
+			% [p_path, error_string(FileAccess.get_open_error())]
+		)
+		return PackedByteArray()
+	return file.get_buffer(file.get_length())
+	
+	
+## Loads any of the output formats of the Blender addon: JSON (`.rxm.json`),
+## binary (`.rxmb`) and binary with a sidecar buffer (a `.rxm.json` header
+## referencing a `.bin` file), each optionally compressed (`.gcpf`).
+## Instance records are followed to the file holding their geometry.
+## With `p_pack`, `p_path` names a file in it.
+static func RawObjectData_from_file(p_path: String, p_pack: RawPack = null) -> RawObjectData:
+	var bytes := get_file_bytes(p_path, p_pack)
+	if p_path.trim_suffix(COMPRESSED_FILE_SUFFIX).ends_with(BINARY_FILE_SUFFIX):
+		var binary_header := get_binary_header(bytes)
+		if binary_header.has("instance_of"):
+			return RawObjectData_from_file(
+				p_path.get_base_dir().path_join(binary_header.instance_of),
+				p_pack
+			)
+		return RawObjectData_from_binary(bytes)
+		
+	var json_string := bytes.get_string_from_utf8()
+	var header = JSON.parse_string(json_string)
+	if header is Dictionary and header.has("instance_of"):
+		return RawObjectData_from_file(p_path.get_base_dir().path_join(header.instance_of), p_pack)
+	if header is Dictionary and header.has("buffers"):
+		var buffer_path := p_path.get_base_dir().path_join(header.buffers[0].uri)
+		return RawObjectData_from_binary_parts(
+			header,
+			get_file_bytes(buffer_path, p_pack)
+		)
+	return RawObjectData_from_json(json_string)
+	
+	
+## The JSON header of a binary export, empty if `p_bytes` isn't one.
+static func get_binary_header(p_bytes: PackedByteArray) -> Dictionary:
+	if not p_bytes.slice(0, 4).get_string_from_ascii() == BINARY_MAGIC:
+		push_error("Not a binary raw export (magic mismatch).")
+		return {}
+	if p_bytes.decode_u32(4) > BINARY_VERSION:
+		push_error("Unsupported binary raw export version: %s" % p_bytes.decode_u32(4))
+		
+	var json_length := p_bytes.decode_u32(12)
+	var json_start := 20
+	return JSON.parse_string(
+		p_bytes.slice(json_start, json_start + json_length).get_string_from_utf8()
+	)
+	
+	
+## The world transform (in Blender's coordinates) an instance record was
+## exported with, or the identity for any other file.
+static func get_instance_transform(p_path: String, p_pack: RawPack = null) -> Transform3D:
+	var bytes := get_file_bytes(p_path, p_pack)
+	var record = (
+		get_binary_header(bytes)
+		if p_path.trim_suffix(COMPRESSED_FILE_SUFFIX).ends_with(BINARY_FILE_SUFFIX)
+		else JSON.parse_string(bytes.get_string_from_utf8())
+	)
+	if not (record is Dictionary and record.has("transform")):
+		return Transform3D.IDENTITY
+	var rows: Array = record.transform
+	return Transform3D(
+		Vector3(rows[0], rows[4], rows[8]),
+		Vector3(rows[1], rows[5], rows[9]),
+		Vector3(rows[2], rows[6], rows[10]),
+		Vector3(rows[3], rows[7], rows[11])
+	)
+	
+	
+static func RawObjectData_from_binary(p_bytes: PackedByteArray) -> RawObjectData:
+	var header := get_binary_header(p_bytes)
+	if header.is_empty():
+		return RawObjectData.new()
+		
+	var json_length := p_bytes.decode_u32(12)
+	var json_start := 20
+	var buffer_length := p_bytes.decode_u32(json_start + json_length)
+	var buffer_start := json_start + json_length + 8
+	return RawObjectData_from_binary_parts(
+		header,
+		p_bytes.slice(buffer_start, buffer_start + buffer_length)
 	)
+	
+	
+static func get_binary_accessor_bytes(
+	p_header: Dictionary,
+	p_buffer: PackedByteArray,
+	p_attribute_name: String
+) -> PackedByteArray:
+	var accessor: Dictionary = p_header.accessors[int(p_header.attributes[p_attribute_name])]
+	var buffer_view: Dictionary = p_header.bufferViews[int(accessor.bufferView)]
+	var start := int(buffer_view.byteOffset)
+	return p_buffer.slice(start, start + int(buffer_view.byteLength))
+	
+	
+static func decode_octahedral(p_encoded: Vector2) -> Vector3:
+	var normal := Vector3(
+		p_encoded.x,
+		p_encoded.y,
+		1.0 - absf(p_encoded.x) - absf(p_encoded.y)
+	)
+	var unfold := maxf(-normal.z, 0.0)
+	normal.x += -unfold if normal.x >= 0.0 else unfold
+	normal.y += -unfold if normal.y >= 0.0 else unfold
+	return normal.normalized()
+	
+	
+static func decode_snorm16(p_bytes: PackedByteArray, p_byte_offset: int) -> float:
+	return maxf(p_bytes.decode_s16(p_byte_offset) / SNORM16_MAX, -1.0)
+	
+	
+## The float components of an attribute, decoded if it's quantized (see
+## "Quantization" in the Blender addon).
+static func get_binary_accessor_floats(
+	p_header: Dictionary,
+	p_buffer: PackedByteArray,
+	p_attribute_name: String
+) -> PackedFloat32Array:
+	var accessor: Dictionary = p_header.accessors[int(p_header.attributes[p_attribute_name])]
+	var bytes := get_binary_accessor_bytes(p_header, p_buffer, p_attribute_name)
+	var component_type := int(accessor.componentType)
+	var encoding: String = accessor.get("encoding", "")
+	if component_type == COMPONENT_TYPE_FLOAT32:
+		return bytes.to_float32_array()
+		
+	var floats := PackedFloat32Array()
+	if encoding == "OCTAHEDRAL":
+		floats.resize(int(accessor.count) * 3)
+		for i in range(int(accessor.count)):
+			var normal := decode_octahedral(Vector2(
+				decode_snorm16(bytes, 4*i),
+				decode_snorm16(bytes, 4*i + 2)
+			))
+			floats[3*i] = normal.x
+			floats[3*i+1] = normal.y
+			floats[3*i+2] = normal.z
+		return floats
+		
+	var component_size := 4 if component_type == COMPONENT_TYPE_UINT32 else 2
+	var offset: Array = accessor.get("offset", [0.0])
+	var scale: Array = accessor.get("scale", [1.0])
+	floats.resize(len(bytes) / component_size)
+	for i in range(len(floats)):
+		var byte_offset := i * component_size
+		var i_component := i % len(offset)
+		if encoding == "FLOAT16":
+			floats[i] = bytes.decode_half(byte_offset)
+		elif encoding == "GRID":
+			var steps := bytes.decode_u32(byte_offset)\
+				if component_type == COMPONENT_TYPE_UINT32\
+				else bytes.decode_u16(byte_offset)
+			floats[i] = offset[i_component] + steps * scale[i_component]
+		elif encoding == "SNORM16":
+			floats[i] = offset[i_component]\
+				+ decode_snorm16(bytes, byte_offset) * scale[i_component]
+		else:
+			push_error("Unsupported encoding of '%s': '%s'." % [p_attribute_name, encoding])
+			return PackedFloat32Array()
+	return floats
+	
+	
+static func convert_packed_float32_array_to_packed_vector3_array(
+	p_floats: PackedFloat32Array
+) -> PackedVector3Array:
+	var vectors := PackedVector3Array()
+	vectors.resize(len(p_floats) / 3)
+	for i in range(len(vectors)):
+		vectors[i] = Vector3(p_floats[3*i], p_floats[3*i+1], p_floats[3*i+2])
+	return vectors
+	
+	
+static func convert_packed_float32_array_to_packed_vector2_array(
+	p_floats: PackedFloat32Array
+) -> PackedVector2Array:
+	var vectors := PackedVector2Array()
+	vectors.resize(len(p_floats) / 2)
+	for i in range(len(vectors)):
+		vectors[i] = Vector2(p_floats[2*i], p_floats[2*i+1])
+	return vectors
+	
+	
+static func RawObjectData_from_binary_parts(
+	p_header: Dictionary,
+	p_buffer: PackedByteArray
+) -> RawObjectData:
+	var material_indices := PackedInt64Array(Array(
+		get_binary_accessor_bytes(p_header, p_buffer, "material_indices").to_int32_array()
+	))
+	var raw_object_data := set_RawObjectData_bounds(RawObjectData.new(
+		convert_packed_float32_array_to_packed_vector3_array(
+			get_binary_accessor_floats(p_header, p_buffer, "vertices")
+		),
+		convert_packed_float32_array_to_packed_vector3_array(
+			get_binary_accessor_floats(p_header, p_buffer, "normals")
+		),
+		convert_packed_float32_array_to_packed_vector2_array(
+			get_binary_accessor_floats(p_header, p_buffer, "uvs")
+		),
+		get_binary_accessor_bytes(p_header, p_buffer, "indices").to_int32_array(),
+		material_indices,
+		MaterialData_array_from_dicts(p_header.materials)
+	), p_header)
+	if p_header.attributes.has("tangents"):
+		raw_object_data.tangents = get_binary_accessor_floats(p_header, p_buffer, "tangents")
+	return raw_object_data
 
 
 class MaterialResolver:
@@ -201,7 +571,11 @@ class BasicMaterialResolver extends MaterialResolver:
 		var materials: Array[Material] = []
 		
 		for basetype_material_data in material_data_array:
-			if basetype_material_data.type == BASIC_MATERIAL_TYPE:
+			# Files of older exports may have image materials without images.
+			if basetype_material_data.type == BASIC_MATERIAL_TYPE or (
+				basetype_material_data.type == IMAGE_FILES_MATERIAL_TYPE
+				and (basetype_material_data as ImageTextureMaterialData).filenames.is_empty()
+			):
 				# Uncomment if you want to access `material_data`.
 				#var material_data := basetype_material_data as BasicMaterialData
 				var material := StandardMaterial3D.new()
@@ -13,7 +13,11 @@ const MInvertSurfaceArrays := MeshLib.MInvertSurfaceArrays
 const RawObjectData := RawExport.RawObjectData
 const BasicMaterialResolver := RawExport.BasicMaterialResolver
 const MaterialResolver := RawExport.MaterialResolver
-# Used: RawExport.RawObjectData_from_json
+# Used: RawExport.RawObjectData_from_json, RawExport.RawObjectData_from_file,
+#  RawExport.RawPack
+
+# Corner order of a tri with its winding inverted.
+const INVERTED_WINDING_CORNERS: Array[int] = [0, 2, 1]
 
 
 static func new_STris_from_file(
@@ -21,8 +25,20 @@ static func new_STris_from_file(
 	p_dbg_apply_fixes = true
 ) -> STris:
 	assert(FileAccess.file_exists(p_path), "File doesn't exist: %s" % p_path)
-	return new_STris_from_JSON(
-		FileAccess.get_file_as_string(p_path),
+	return new_STris_from_RawObjectData(
+		RawExport.RawObjectData_from_file(p_path),
+		p_dbg_apply_fixes
+	)
+	
+	
+static func new_STris_from_pack(
+	p_pack: RawExport.RawPack,
+	p_name: String,
+	p_dbg_apply_fixes = true
+) -> STris:
+	assert(p_pack.has_file(p_name), "File not in pack: %s" % p_name)
+	return new_STris_from_RawObjectData(
+		RawExport.RawObjectData_from_file(p_name, p_pack),
 		p_dbg_apply_fixes
 	)
 	
@@ -48,6 +64,20 @@ static func new_STris_from_RawObjectData(
 	var normals := p_raw_object_data.normals
 	var uvs := p_raw_object_data.uvs
 	
+	if len(p_raw_object_data.indices) > 0:
+		# Indexed export: Expand back to one vertex per face corner, as
+		# `STris` only holds unindexed tris. Known limitation: this undoes
+		# the savings of indexing after loading (and takes a while for big
+		# meshes); `new_MeshInstance3D_from_RawObjectData` keeps the indices.
+		# The same goes for tangents, which `STris` has no room for.
+		vertices = PackedVector3Array()
+		normals = PackedVector3Array()
+		uvs = PackedVector2Array()
+		for i_vertex in p_raw_object_data.indices:
+			vertices.append(p_raw_object_data.vertices[i_vertex])
+			normals.append(p_raw_object_data.normals[i_vertex])
+			uvs.append(p_raw_object_data.uvs[i_vertex])
+			
 	if not len(vertices) % 3 == 0:
 		push_error(
 			"Attempted to initialize `STris` from a list of vertices not"
@@ -88,3 +118,101 @@ static func new_STris_from_RawObjectData(
 		p_raw_object_data.material_indices,
 		resolver.get_materials()
 	)
+		
+		
+## Blender's coordinates to Godot's, as the `MYUp` and `MFlipVerticesX`
+## fixes convert them.
+static func get_godot_vector3(p_vector: Vector3) -> Vector3:
+	return Vector3(-p_vector.x, p_vector.z, p_vector.y)
+	
+	
+## Builds the mesh straight from the buffers of `p_raw_object_data`, one
+## surface per submesh, with the same fixes applied as by
+## `new_STris_from_RawObjectData` (Y up, X flipped, V flipped, winding
+## inverted). Unlike `STris`, it keeps indexed exports indexed
+## (`Mesh.ARRAY_INDEX`), so shared vertices are uploaded to the GPU once,
+## and passes exported tangents on (`Mesh.ARRAY_TANGENT`), so they needn't
+## be generated at runtime.
+## Files exported before submeshes were written go through `STris`.
+static func new_MeshInstance3D_from_RawObjectData(
+	p_raw_object_data: RawObjectData,
+	p_ResolverClass := BasicMaterialResolver,
+) -> MeshInstance3D:
+	if p_raw_object_data.submeshes.is_empty():
+		return new_STris_from_RawObjectData(
+			p_raw_object_data,
+			true,
+			p_ResolverClass
+		).get_mesh_instance_3d()
+		
+	var is_indexed := len(p_raw_object_data.indices) > 0
+	var has_tangents := len(p_raw_object_data.tangents) > 0
+	var materials: Array[Material] = p_ResolverClass.new(
+		p_raw_object_data.material_data
+	).get_materials()
+	var array_mesh := ArrayMesh.new()
+	for submesh in p_raw_object_data.submeshes:
+		if submesh.face_count == 0:
+			continue
+		var vertex_start: int = submesh.vertex_start
+		var vertex_count: int = submesh.vertex_count
+		var corner_start: int = 3 * submesh.face_start
+		var corner_count: int = 3 * submesh.face_count
+		
+		var vertices := PackedVector3Array()
+		var normals := PackedVector3Array()
+		var uvs := PackedVector2Array()
+		vertices.resize(vertex_count)
+		normals.resize(vertex_count)
+		uvs.resize(vertex_count)
+		for i in range(vertex_count):
+			vertices[i] = get_godot_vector3(p_raw_object_data.vertices[vertex_start + i])
+			normals[i] = get_godot_vector3(p_raw_object_data.normals[vertex_start + i])
+			var uv := p_raw_object_data.uvs[vertex_start + i]
+			uvs[i] = Vector2(uv.x, 1.0 - uv.y)
+			
+		var tangents := PackedFloat32Array()
+		if has_tangents:
+			tangents = p_raw_object_data.tangents.slice(
+				4 * vertex_start,
+				4 * (vertex_start + vertex_count)
+			)
+			for i in range(vertex_count):
+				var tangent := get_godot_vector3(Vector3(
+					tangents[4*i], tangents[4*i+1], tangents[4*i+2]
+				))
+				tangents[4*i] = tangent.x
+				tangents[4*i+1] = tangent.y
+				tangents[4*i+2] = tangent.z
+				# V is flipped, so the bitangent points the other way.
+				tangents[4*i+3] = -tangents[4*i+3]
+				
+		# Relative to the submesh's vertices, every tri's last two corners
+		# swapped, as Godot's front faces wind the other way.
+		var indices := PackedInt32Array()
+		indices.resize(corner_count)
+		for i in range(corner_count):
+			var i_corner := corner_start + i - i % 3 + INVERTED_WINDING_CORNERS[i % 3]
+			indices[i] = (
+				p_raw_object_data.indices[i_corner] if is_indexed else i_corner
+			) - vertex_start
+			
+		var arrays := []
+		arrays.resize(Mesh.ARRAY_MAX)
+		arrays[Mesh.ARRAY_VERTEX] = vertices
+		arrays[Mesh.ARRAY_NORMAL] = normals
+		arrays[Mesh.ARRAY_TEX_UV] = uvs
+		if has_tangents:
+			arrays[Mesh.ARRAY_TANGENT] = tangents
+		arrays[Mesh.ARRAY_INDEX] = indices
+		array_mesh.add_surface_from_arrays(Mesh.PRIMITIVE_TRIANGLES, arrays)
+		var material_index: int = submesh.material_index
+		if material_index < len(materials):
+			array_mesh.surface_set_material(
+				array_mesh.get_surface_count() - 1,
+				materials[material_index]
+			)
+			
+	var mesh_instance := MeshInstance3D.new()
+	mesh_instance.mesh = array_mesh
+	return mesh_instance
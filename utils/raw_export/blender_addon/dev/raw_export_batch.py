@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2023 Aziroshin (Christian Knuchel)
+"""Exports many .blend files headlessly, running one background Blender per
+file, several in parallel, and writes a per-file report.
+
+Usage:
+    python3 raw_export_batch.py "parts/**/*.blend" --output-dir ../../../../assets/parts \\
+        [--jobs 4] [--format BINARY] [--report report.json]
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+DEV_DIR = Path(__file__).resolve().parent
+RUNNER_PATH = DEV_DIR / "raw_export_runner.py"
+REPORT_FILE_NAME = "rxm_batch_report.json"
+# How much of Blender's output to keep in the report of a failed export.
+OUTPUT_TAIL_LEN = 4000
+
+
+def get_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("blend_files", nargs="+", help=".blend files or glob patterns.")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument(
+        "--blender",
+        default=os.environ.get("BLENDER_BIN", "blender"),
+        help="Blender binary (default: $BLENDER_BIN or `blender`)."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Blender processes running in parallel (default: one per CPU)."
+    )
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds per file.")
+    parser.add_argument("--report", default=None, help=f"Default: <output-dir>/{REPORT_FILE_NAME}")
+    # Passed through to `raw_export_runner.py`.
+    parser.add_argument("--format", choices=["JSON", "BINARY", "BINARY_SIDECAR"], default=None)
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--float-digits", type=int, default=None)
+    parser.add_argument("--indexed", action="store_true")
+    parser.add_argument("--vertex-cache-size", type=int, default=None)
+    parser.add_argument("--compression", choices=["NONE", "DEFLATE", "GZIP", "ZSTD"], default=None)
+    parser.add_argument("--compression-level", type=int, default=None)
+    # Safe with several jobs, as the manifest is merged under a lock on save.
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--memory-limit", type=int, default=None, help="MiB per Blender process.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Writer threads per Blender process (default: 1, as files are "
+             "already exported in parallel)."
+    )
+    return parser.parse_args(argv)
+
+
+def get_blend_file_paths(patterns: List[str]) -> List[Path]:
+    paths: Dict[Path, None] = {}
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for match in sorted(matches):
+            paths[Path(match).resolve()] = None
+    return list(paths)
+
+
+def get_runner_args(args: argparse.Namespace, report_path: str) -> List[str]:
+    runner_args = [
+        "--directory", str(Path(args.output_dir).resolve()),
+        "--workers", str(args.workers),
+        "--report", report_path,
+    ]
+    if args.format is not None:
+        runner_args += ["--format", args.format]
+    if args.compact:
+        runner_args.append("--compact")
+    if args.float_digits is not None:
+        runner_args += ["--float-digits", str(args.float_digits)]
+    if args.indexed:
+        runner_args.append("--indexed")
+    if args.vertex_cache_size is not None:
+        runner_args += ["--vertex-cache-size", str(args.vertex_cache_size)]
+    if args.compression is not None:
+        runner_args += ["--compression", args.compression]
+    if args.compression_level is not None:
+        runner_args += ["--compression-level", str(args.compression_level)]
+    if args.incremental:
+        runner_args.append("--incremental")
+    if args.memory_limit is not None:
+        runner_args += ["--memory-limit", str(args.memory_limit)]
+    return runner_args
+
+
+def export_blend_file(blend_file_path: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"blend_file": str(blend_file_path), "success": False}
+    with tempfile.TemporaryDirectory(prefix="rxm_batch_") as temp_dir:
+        runner_report_path = os.path.join(temp_dir, "result.json")
+        command = [
+            args.blender,
+            "--background",
+            "--factory-startup",
+            str(blend_file_path),
+            "--python", str(RUNNER_PATH),
+            "--",
+            *get_runner_args(args, runner_report_path),
+        ]
+
+        start = time.perf_counter()
+        try:
+            process = subprocess.run(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                timeout=args.timeout
+            )
+        except (OSError, subprocess.TimeoutExpired) as error:
+            result["seconds"] = time.perf_counter() - start
+            result["error"] = repr(error)
+            return result
+        result["seconds"] = time.perf_counter() - start
+        result["return_code"] = process.returncode
+
+        try:
+            runner_result = json.loads(Path(runner_report_path).read_text())
+        except (OSError, ValueError):
+            runner_result = {"error": "The runner didn't report a result."}
+
+    result["object_count"] = runner_result.get("object_count")
+    result["export_seconds"] = runner_result.get("seconds")
+    result["error"] = runner_result.get("error")
+    result["success"] = process.returncode == 0 and runner_result.get("success", False)
+    if not result["success"]:
+        result["output_tail"] = process.stdout[-OUTPUT_TAIL_LEN:]
+    return result
+
+
+def main(argv: List[str]) -> int:
+    args = get_args(argv)
+    blend_file_paths = get_blend_file_paths(args.blend_files)
+    if not blend_file_paths:
+        print("No .blend files found.", file=sys.stderr)
+        return 2
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        results = list(executor.map(
+            lambda path: export_blend_file(path, args),
+            blend_file_paths
+        ))
+    failed_count = sum(1 for result in results if not result["success"])
+
+    report = {
+        "seconds": time.perf_counter() - start,
+        "jobs": args.jobs,
+        "file_count": len(results),
+        "failed_count": failed_count,
+        "files": results,
+    }
+    report_path = Path(args.report or Path(args.output_dir) / REPORT_FILE_NAME)
+    report_path.write_text(json.dumps(report, indent=4))
+
+    for result in results:
+        print(
+            f"{'ok  ' if result['success'] else 'FAIL'} {result['seconds']:8.2f}s "
+            f"{result.get('object_count') or 0:>5} objects  {result['blend_file']}"
+        )
+    print(
+        f"{len(results) - failed_count}/{len(results)} files exported in "
+        f"{report['seconds']:.2f}s with {args.jobs} job(s). Report: {report_path}"
+    )
+    return 1 if failed_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
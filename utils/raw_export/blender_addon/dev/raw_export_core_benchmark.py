@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2023 Aziroshin (Christian Knuchel)
+"""Benchmarks extraction-to-bytes of `raw_export/core.py` outside of
+Blender, on synthetic grid meshes, measures how the writing of several
+objects scales with the workers of `ObjectWriterPool`, and checks the `.rxm.json` fixtures in
+`assets/parts` as regression baselines: re-encoding them has to reproduce
+them byte for byte, and their binary encoding has to decode to the same
+values.
+
+Usage:
+    python3 raw_export_core_benchmark.py [--sizes 1000 10000 100000 1000000]
+        [--repeats 3] [--workers 1 4] [--report report.json]
+"""
+import argparse
+import importlib.util
+import json
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, NamedTuple
+
+import numpy as np
+
+DEV_DIR = Path(__file__).resolve().parent
+CORE_PATH = DEV_DIR.parent / "raw_export" / "core.py"
+FIXTURES_DIR = DEV_DIR.parent.parent.parent.parent / "assets" / "parts"
+DEFAULT_TRIANGLE_COUNTS = [1_000, 10_000, 100_000, 1_000_000]
+# Objects written per worker count, all of the same size.
+WORKER_SCALING_OBJECT_COUNT = 8
+WORKER_SCALING_TRIANGLE_COUNT = 20_000
+
+
+def import_core() -> ModuleType:
+    """Imports `core.py` on its own, as importing it as part of the
+    `raw_export` package would run the package's `__init__.py`, which
+    needs `bpy`."""
+    spec = importlib.util.spec_from_file_location("raw_export_core", CORE_PATH)
+    core = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = core
+    spec.loader.exec_module(core)
+    return core
+
+
+rxm = import_core()
+
+
+###########################################################################
+# Stand-ins for the parts of `bpy.types.Mesh` that `extract_object_data`
+# uses.
+###########################################################################
+class StandInCollection:
+    def __init__(self, length: int, attributes: Dict[str, np.ndarray]):
+        self._length = length
+        self._attributes = attributes
+
+    def __len__(self) -> int:
+        return self._length
+
+    def foreach_get(self, attribute: str, seq) -> None:
+        values = self._attributes[attribute]
+        np.frombuffer(seq, dtype=values.dtype)[:] = values.ravel()
+
+
+class StandInUVLayer:
+    def __init__(self, uvs: np.ndarray):
+        self.data = StandInCollection(len(uvs), {"uv": uvs})
+
+
+class StandInUVLayers:
+    def __init__(self, active: StandInUVLayer):
+        self.active = active
+
+
+class StandInMesh:
+    """A mesh of quads, each triangulated along its first diagonal."""
+    def __init__(
+            self,
+            positions: np.ndarray,
+            normals: np.ndarray,
+            loop_vertex_indices: np.ndarray,
+            loop_uvs: np.ndarray,
+            loop_tangents: np.ndarray,
+            material_indices: np.ndarray
+    ):
+        quad_count = len(loop_vertex_indices) // 4
+        quad_loop_starts = np.arange(0, 4 * quad_count, 4, dtype=np.int32)
+        self.vertices = StandInCollection(len(positions), {"co": positions, "normal": normals})
+        self.loops = StandInCollection(len(loop_vertex_indices), {
+            "vertex_index": loop_vertex_indices,
+            "normal": normals[loop_vertex_indices],
+            "tangent": loop_tangents,
+            "bitangent_sign": np.ones(len(loop_vertex_indices), dtype=np.float32),
+        })
+        self.polygons = StandInCollection(quad_count, {
+            "loop_start": quad_loop_starts,
+            "loop_total": np.full(quad_count, 4, dtype=np.int32),
+            "material_index": material_indices,
+        })
+        self.loop_triangles = StandInCollection(2 * quad_count, {
+            "loops": (quad_loop_starts[:, None] + np.array([0, 1, 2, 0, 2, 3], dtype=np.int32)).ravel(),
+            "material_index": np.repeat(material_indices, 2),
+        })
+        self.uv_layers = StandInUVLayers(StandInUVLayer(loop_uvs))
+
+    def calc_loop_triangles(self) -> None:
+        pass
+
+    def calc_tangents(self) -> None:
+        pass
+
+
+def get_grid_mesh(triangle_count: int) -> StandInMesh:
+    """A wavy grid of quads, which triangulate into at least
+    `triangle_count` triangles, its UVs spanning [0, 1] and four materials
+    in stripes."""
+    quads_per_side = max(1, math.ceil(math.sqrt(triangle_count / 2)))
+    side = quads_per_side + 1
+    xs, ys = np.meshgrid(np.arange(side, dtype=np.float32), np.arange(side, dtype=np.float32))
+    heights = np.sin(xs * 0.3) * np.cos(ys * 0.2)
+    positions = np.stack([xs, ys, heights], axis=-1).reshape(-1, 3)
+    normals = np.stack([
+        -0.3 * np.cos(xs * 0.3) * np.cos(ys * 0.2),
+        0.2 * np.sin(xs * 0.3) * np.sin(ys * 0.2),
+        np.ones_like(xs),
+    ], axis=-1).reshape(-1, 3)
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+
+    quad_xs, quad_ys = np.meshgrid(np.arange(quads_per_side), np.arange(quads_per_side))
+    corners = (quad_ys * side + quad_xs).ravel()
+    loop_vertex_indices = np.stack([
+        corners, corners + 1, corners + side + 1, corners + side,
+    ], axis=-1).reshape(-1).astype(np.int32)
+    loop_uvs = positions[loop_vertex_indices, 0:2] / quads_per_side
+    # U runs along x, so the tangents follow the slope of the grid along x.
+    tangents = np.stack([
+        np.ones_like(xs),
+        np.zeros_like(xs),
+        0.3 * np.cos(xs * 0.3) * np.cos(ys * 0.2),
+    ], axis=-1).reshape(-1, 3)
+    tangents /= np.linalg.norm(tangents, axis=1, keepdims=True)
+    material_indices = (quad_ys.ravel() % 4).astype(np.int32)
+    return StandInMesh(
+        positions.astype(np.float32),
+        normals.astype(np.float32),
+        loop_vertex_indices,
+        loop_uvs.astype(np.float32),
+        tangents[loop_vertex_indices].astype(np.float32),
+        material_indices
+    )
+
+
+###########################################################################
+# Throughput
+###########################################################################
+class Scenario(NamedTuple):
+    name: str
+    settings: Any
+    tangents: bool = False
+
+
+SCENARIOS = [
+    Scenario("json", rxm.ExportSettings()),
+    Scenario("json_compact_6", rxm.ExportSettings(json_compact=True, float_digits=6)),
+    Scenario("binary", rxm.ExportSettings(output_format="BINARY")),
+    Scenario("binary_indexed", rxm.ExportSettings(output_format="BINARY", indexed=True)),
+    Scenario("binary_vertex_cache", rxm.ExportSettings(
+        output_format="BINARY",
+        indexed=True,
+        vertex_cache_size=16
+    )),
+    Scenario(
+        "binary_tangents",
+        rxm.ExportSettings(output_format="BINARY", indexed=True, vertex_cache_size=16),
+        tangents=True
+    ),
+    Scenario("binary_quantized", rxm.ExportSettings(
+        output_format="BINARY",
+        indexed=True,
+        quantization=rxm.Quantization("GRID", 0.001, "SNORM16", "OCTAHEDRAL")
+    )),
+    Scenario("binary_deflate", rxm.ExportSettings(
+        output_format="BINARY",
+        indexed=True,
+        compression="DEFLATE"
+    )),
+]
+if rxm.zstandard is not None:
+    SCENARIOS.append(Scenario("binary_zstd", rxm.ExportSettings(
+        output_format="BINARY",
+        indexed=True,
+        compression="ZSTD",
+        compression_level=3
+    )))
+
+MATERIALS = [rxm.DefaultMaterialData(index) for index in range(4)]
+
+
+def run_scenario(
+        mesh: StandInMesh,
+        scenario: Scenario,
+        output_dir: str,
+        repeats: int
+) -> Dict[str, Any]:
+    file_path = str(Path(output_dir) / f"{scenario.name}.rxm.json")
+    best_seconds = float("inf")
+    report = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        object_data = rxm.extract_triangulated_object_data(mesh, scenario.tangents)
+        report = rxm.write_object_file(file_path, scenario.settings, object_data, MATERIALS)
+        best_seconds = min(best_seconds, time.perf_counter() - start)
+        del object_data
+
+    # In a pass of its own, as tracing every allocation slows the
+    # pure-Python paths down several times over.
+    tracemalloc.start()
+    try:
+        object_data = rxm.extract_triangulated_object_data(mesh, scenario.tangents)
+        rxm.write_object_file(file_path, scenario.settings, object_data, MATERIALS)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del object_data
+    return {
+        "scenario": scenario.name,
+        "seconds": best_seconds,
+        "triangles_per_second": len(mesh.loop_triangles) / best_seconds,
+        "peak_bytes": peak_bytes,
+        "output_bytes": report.written_size,
+        "uncompressed_bytes": report.uncompressed_size,
+        "vertex_cache_stats": report.vertex_cache_stats and report.vertex_cache_stats._asdict(),
+    }
+
+
+def run_worker_scaling(
+        mesh: StandInMesh,
+        scenario: Scenario,
+        output_dir: str,
+        worker_count: int,
+        repeats: int
+) -> Dict[str, Any]:
+    """Writes `WORKER_SCALING_OBJECT_COUNT` objects on a pool of
+    `worker_count` workers, like an export of a collection does. Extraction
+    is left out, as it's on the main thread either way."""
+    object_data = rxm.extract_triangulated_object_data(mesh, scenario.tangents)
+    best_seconds = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        writer_pool = rxm.ObjectWriterPool(worker_count)
+        for i_object in range(WORKER_SCALING_OBJECT_COUNT):
+            writer_pool.submit(rxm.ObjectExportJob(
+                str(Path(output_dir) / f"{scenario.name}_{i_object}.rxm.json"),
+                scenario.settings,
+                object_data,
+                MATERIALS
+            ))
+        writer_pool.close()
+        best_seconds = min(best_seconds, time.perf_counter() - start)
+        if writer_pool.errors:
+            raise writer_pool.errors[0][1]
+    return {
+        "scenario": scenario.name,
+        "workers": worker_count,
+        "objects": WORKER_SCALING_OBJECT_COUNT,
+        "seconds": best_seconds,
+    }
+
+
+###########################################################################
+# Fixture baselines
+###########################################################################
+def get_material_data(material: Dict[str, Any]) -> rxm.MaterialData:
+    if material["type"] == "BASIC":
+        return rxm.BasicMaterialData(material["index"], material["name"], rxm.Vector(material["color"]))
+    if material["type"] == "IMAGE_FILES":
+        return rxm.ImageTextureMaterialData(material["index"], material["name"], material["filenames"])
+    return rxm.DefaultMaterialData(material["index"])
+
+
+def get_fixture_object_data(fixture: Dict[str, Any]) -> rxm.ObjectData:
+    object_data = rxm.ObjectData(poly_size=3)
+    object_data.vertices.extend(component for vertex in fixture["vertices"] for component in vertex)
+    object_data.normals.extend(component for normal in fixture["normals"] for component in normal)
+    object_data.uvs.extend(component for uv in fixture["uvs"] for component in uv)
+    object_data.indices.extend(fixture["indices"])
+    object_data.material_indices.extend(fixture["material_indices"])
+    return object_data
+
+
+def get_rxm_binary_values(file_bytes: bytes, name: str) -> List[float]:
+    json_length = struct.unpack_from("<I", file_bytes, 12)[0]
+    header = json.loads(file_bytes[20:20 + json_length])
+    buffer_start = 20 + json_length + 8
+    accessor = header["accessors"][header["attributes"][name]]
+    buffer_view = header["bufferViews"][accessor["bufferView"]]
+    typecode = "<f" if accessor["componentType"] == rxm.ComponentTypes.FLOAT32 else "<i"
+    start = buffer_start + buffer_view["byteOffset"]
+    return list(np.frombuffer(
+        file_bytes[start:start + buffer_view["byteLength"]],
+        dtype=np.dtype(typecode)
+    ))
+
+
+def check_fixture(fixture_path: Path, output_dir: str) -> Dict[str, Any]:
+    fixture_text = fixture_path.read_text()
+    fixture = json.loads(fixture_text)
+    object_data = get_fixture_object_data(fixture)
+    materials = [get_material_data(material) for material in fixture["materials"]]
+
+    json_path = str(Path(output_dir) / fixture_path.name)
+    rxm.write_object_file(json_path, rxm.ExportSettings(), object_data, materials)
+    json_identical = Path(json_path).read_text() == fixture_text
+
+    binary_report = rxm.write_object_file(
+        json_path,
+        rxm.ExportSettings(output_format="BINARY"),
+        object_data,
+        materials
+    )
+    binary_bytes = Path(rxm.get_rxm_binary_file_path(json_path)).read_bytes()
+    binary_identical = all(
+        get_rxm_binary_values(binary_bytes, name) == list(getattr(object_data, name))
+        for name in ("vertices", "normals", "uvs", "indices", "material_indices")
+    )
+    return {
+        "fixture": fixture_path.name,
+        "json_identical": json_identical,
+        "binary_identical": binary_identical,
+        "json_bytes": len(fixture_text.encode("utf-8")),
+        "binary_bytes": binary_report.written_size,
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_TRIANGLE_COUNTS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, os.cpu_count() or 1}),
+        help="Worker counts to compare the writing of several objects with."
+    )
+    parser.add_argument("--report", default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {"throughput": [], "worker_scaling": [], "fixtures": []}
+    with tempfile.TemporaryDirectory(prefix="rxm_benchmark_") as output_dir:
+        print(f"{'triangles':>10}  {'scenario':<20}{'seconds':>10}{'tris/s':>12}{'peak MiB':>10}{'output KiB':>12}")
+        for triangle_count in args.sizes:
+            mesh = get_grid_mesh(triangle_count)
+            for scenario in SCENARIOS:
+                result = run_scenario(mesh, scenario, output_dir, args.repeats)
+                result["triangles"] = len(mesh.loop_triangles)
+                results["throughput"].append(result)
+                print(
+                    f"{result['triangles']:>10}  {scenario.name:<20}{result['seconds']:>10.4f}"
+                    f"{result['triangles_per_second']:>12.0f}{result['peak_bytes'] / 2**20:>10.1f}"
+                    f"{result['output_bytes'] / 2**10:>12.1f}"
+                )
+
+        # Relative to the first worker count, normally 1.
+        mesh = get_grid_mesh(WORKER_SCALING_TRIANGLE_COUNT)
+        print(
+            f"\n{WORKER_SCALING_OBJECT_COUNT} objects of {len(mesh.loop_triangles)} triangles"
+            f" ({os.cpu_count()} CPUs)"
+        )
+        print(f"{'scenario':<20}{'workers':>8}{'seconds':>10}{'speedup':>9}")
+        for scenario in SCENARIOS:
+            baseline_seconds = None
+            for worker_count in args.workers:
+                result = run_worker_scaling(mesh, scenario, output_dir, worker_count, args.repeats)
+                if baseline_seconds is None:
+                    baseline_seconds = result["seconds"]
+                result["speedup"] = baseline_seconds / result["seconds"]
+                results["worker_scaling"].append(result)
+                print(
+                    f"{scenario.name:<20}{worker_count:>8}{result['seconds']:>10.4f}"
+                    f"{result['speedup']:>8.2f}x"
+                )
+
+        failed = 0
+        print(f"\n{'fixture':<60}{'json':>6}{'binary':>8}")
+        for fixture_path in sorted(FIXTURES_DIR.glob("*.rxm.json")):
+            result = check_fixture(fixture_path, output_dir)
+            results["fixtures"].append(result)
+            if not (result["json_identical"] and result["binary_identical"]):
+                failed += 1
+            print(
+                f"{fixture_path.name[:59]:<60}"
+                f"{'ok' if result['json_identical'] else 'DIFF':>6}"
+                f"{'ok' if result['binary_identical'] else 'DIFF':>8}"
+            )
+
+    if args.report is not None:
+        Path(args.report).write_text(json.dumps(results, indent=4))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,143 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2023 Aziroshin (Christian Knuchel)
+"""Micro-benchmarks `raw_export.AllJSONEncoders` against the exception-driven
+encoder chain it replaced, on the `.rxm.json` fixtures in `assets/parts`, and
+checks that both produce identical JSON.
+
+Usage:
+    blender --background --python raw_export_encoding_benchmark.py -- [repeats]
+"""
+import json
+import sys
+import time
+from json import JSONEncoder
+from pathlib import Path
+from typing import Any, Dict, List
+
+from mathutils import Vector
+
+DEV_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = DEV_DIR.parent.parent.parent.parent / "assets" / "parts"
+
+sys.path.insert(0, str(DEV_DIR.parent))
+import raw_export  # noqa: E402
+
+
+###########################################################################
+# The replaced encoder chain, verbatim in behaviour (including the class
+# level `encoders` list growing with every `json.dumps` call).
+###########################################################################
+class LegacyJSONVectorEncoder(JSONEncoder):
+    def default(self, vector):
+        if isinstance(vector, Vector):
+            try:
+                vector.z
+            except AttributeError:
+                return vector.x, vector.y
+
+            try:
+                vector.w
+            except AttributeError:
+                return vector.x, vector.y, vector.z
+
+            return vector.x, vector.y, vector.z, vector.w
+
+        return super().default(vector)
+
+
+class LegacyJSONEncoderByMethod(JSONEncoder):
+    def default(self, item):
+        if hasattr(item, "__to_json_serializable__"):
+            return item.__to_json_serializable__()
+
+        return super().default(item)
+
+
+class LegacyAllJSONEncoders(JSONEncoder):
+    encoders: List[JSONEncoder] = []
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        for encoder_class in (
+                LegacyJSONVectorEncoder,
+                LegacyJSONEncoderByMethod,
+                JSONEncoder
+        ):
+            self.encoders.append(encoder_class(**kwargs))
+
+    def default(self, item):
+        encoders_tried = 0
+        for encoder in self.encoders:
+            try:
+                return encoder.default(item)
+            except TypeError as error:
+                encoders_tried += 1
+                if encoders_tried < len(self.encoders):
+                    continue
+                else:
+                    raise error
+###########################################################################
+
+
+def get_material_data(material: Dict[str, Any]) -> raw_export.MaterialData:
+    if material["type"] == "BASIC":
+        return raw_export.BasicMaterialData(
+            material["index"],
+            material["name"],
+            Vector(material["color"])
+        )
+    if material["type"] == "IMAGE_FILES":
+        return raw_export.ImageTextureMaterialData(
+            material["index"],
+            material["name"],
+            material["filenames"]
+        )
+    return raw_export.DefaultMaterialData(material["index"])
+
+
+def get_pre_json(fixture_path: Path) -> Dict[str, Any]:
+    """The fixture as the object graph the exporter used to encode."""
+    fixture = json.loads(fixture_path.read_text())
+    return {
+        "vertices": [Vector(vertex) for vertex in fixture["vertices"]],
+        "normals": [Vector(normal) for normal in fixture["normals"]],
+        "uvs": [Vector(uv) for uv in fixture["uvs"]],
+        "indices": fixture["indices"],
+        "material_indices": fixture["material_indices"],
+        "materials": [get_material_data(m) for m in fixture["materials"]],
+    }
+
+
+def get_best_time(pre_json: Dict[str, Any], encoder_class, repeats: int):
+    best_time = float("inf")
+    encoded = ""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encoded = json.dumps(pre_json, cls=encoder_class, indent=4)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, encoded
+
+
+def main(repeats: int) -> int:
+    failed = 0
+    print(f"{'fixture':<60}{'legacy (s)':>12}{'dispatch (s)':>14}{'speedup':>10}  identical")
+    for fixture_path in sorted(FIXTURES_DIR.glob("*.rxm.json")):
+        pre_json = get_pre_json(fixture_path)
+        legacy_time, legacy_json = get_best_time(pre_json, LegacyAllJSONEncoders, repeats)
+        dispatch_time, dispatch_json = get_best_time(pre_json, raw_export.AllJSONEncoders, repeats)
+        identical = legacy_json == dispatch_json
+        if not identical:
+            failed += 1
+        print(
+            f"{fixture_path.name[:59]:<60}{legacy_time:>12.4f}{dispatch_time:>14.4f}"
+            f"{legacy_time / max(dispatch_time, 1e-9):>9.1f}x  {'yes' if identical else 'NO'}"
+        )
+    print(
+        f"Legacy encoders accumulated by the chain: {len(LegacyAllJSONEncoders.encoders)}"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    sys.exit(main(int(args[0]) if args else 5))
@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2023 Aziroshin (Christian Knuchel)
+"""Benchmarks the bulk mesh extraction against the BMesh-based reference and
+checks that both produce identical output. The triangulated extraction
+(what the exporter actually uses) is timed alongside; its corners differ
+from the reference for quads and n-gons, so it's only checked for being a
+whole number of triangles.
+
+Usage:
+    blender --background raw_export.blend \\
+        --python raw_export_extraction_benchmark.py -- [repeats]
+"""
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import bpy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import raw_export  # noqa: E402
+
+
+def get_best_time(func: Callable, repeats: int):
+    best_time = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, result
+
+
+def extract_from_mesh(
+        obj: bpy.types.Object,
+        extract: Callable[[bpy.types.Mesh], raw_export.ObjectData]
+) -> raw_export.ObjectData:
+    """Runs `extract` on a temporary mesh of `obj`, freeing the mesh
+    afterwards, as `extract_object_data_bmesh` does."""
+    try:
+        return extract(obj.to_mesh())
+    finally:
+        obj.to_mesh_clear()
+
+
+def get_mismatches(
+        reference: raw_export.ObjectData,
+        candidate: raw_export.ObjectData
+) -> List[str]:
+    return [
+        attribute
+        for attribute in ("vertices", "normals", "uvs", "material_indices")
+        if getattr(reference, attribute) != getattr(candidate, attribute)
+    ]
+
+
+def main(repeats: int) -> int:
+    mesh_objects = [obj for obj in bpy.data.objects if obj.type == "MESH"]
+    failed = 0
+
+    print(
+        f"{'object':<40}{'corners':>10}{'bmesh (s)':>12}{'bulk (s)':>12}{'speedup':>10}"
+        f"{'tri (s)':>12}{'speedup':>10}  identical"
+    )
+    for obj in mesh_objects:
+        bmesh_time, bmesh_object_data = get_best_time(
+            lambda: raw_export.extract_object_data_bmesh(obj, 3),
+            repeats
+        )
+        bulk_time, bulk_object_data = get_best_time(
+            lambda: extract_from_mesh(obj, lambda mesh: raw_export.extract_object_data(mesh, 3)),
+            repeats
+        )
+        triangulated_time, triangulated_object_data = get_best_time(
+            lambda: extract_from_mesh(obj, raw_export.extract_triangulated_object_data),
+            repeats
+        )
+        mismatches = get_mismatches(bmesh_object_data, bulk_object_data)
+        if triangulated_object_data.corner_count != 3 * len(triangulated_object_data.material_indices):
+            mismatches.append("triangles")
+        if mismatches:
+            failed += 1
+
+        print(
+            f"{obj.name[:39]:<40}{bulk_object_data.corner_count:>10}"
+            f"{bmesh_time:>12.4f}{bulk_time:>12.4f}"
+            f"{bmesh_time / max(bulk_time, 1e-9):>9.1f}x"
+            f"{triangulated_time:>12.4f}"
+            f"{bmesh_time / max(triangulated_time, 1e-9):>9.1f}x"
+            f"  {'yes' if not mismatches else 'NO: ' + ', '.join(mismatches)}"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    sys.exit(main(int(args[0]) if args else 3))
@@ -1,11 +1,128 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # Copyright (C) 2023 Aziroshin (Christian Knuchel)
+"""Exports all export-eligible objects of the loaded .blend file.
+
+Meant to be run by Blender in background mode, usually through
+`raw_export_batch.py`:
+    blender --background parts.blend --python raw_export_runner.py -- \\
+        --directory /path/to/output [--format BINARY] [--report result.json]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
 import bpy
 
+ADDON_PARENT_DIR = Path(__file__).resolve().parent.parent
+
+
+def get_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="raw_export_runner.py")
+    parser.add_argument("--directory", required=True, help="Output directory.")
+    parser.add_argument(
+        "--format",
+        choices=["JSON", "BINARY", "BINARY_SIDECAR"],
+        default=None,
+        help="Output format (default: as configured in the .blend file)."
+    )
+    parser.add_argument("--compact", action="store_true", help="Write compact JSON.")
+    parser.add_argument("--float-digits", type=int, default=None)
+    parser.add_argument("--indexed", action="store_true", help="Write indexed vertices.")
+    parser.add_argument(
+        "--vertex-cache-size",
+        type=int,
+        default=None,
+        help="Reorder indexed output for a vertex cache of this size."
+    )
+    parser.add_argument("--compression", choices=["NONE", "DEFLATE", "GZIP", "ZSTD"], default=None)
+    parser.add_argument("--compression-level", type=int, default=None)
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument(
+        "--pack",
+        default=None,
+        metavar="NAME",
+        help="Also pack the exported files into NAME.rxmpack in the output directory."
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--memory-limit", type=int, default=None, help="In MiB.")
+    parser.add_argument("--profile", action="store_true", help="Write a per-phase profile.")
+    parser.add_argument("--report", default=None, help="Write the result as JSON to this file.")
+    return parser.parse_args(argv)
+
+
+def ensure_addon_registered() -> None:
+    """With `--factory-startup`, user addons aren't loaded, so register the
+    addon from the repository instead."""
+    if hasattr(bpy.types.Scene, "rxm_output_format"):
+        return
+    sys.path.insert(0, str(ADDON_PARENT_DIR))
+    import raw_export
+    raw_export.register()
+
+
+def configure_scene(scene: bpy.types.Scene, args: argparse.Namespace) -> None:
+    scene.directory = str(Path(args.directory).resolve())
+    if args.format is not None:
+        scene.rxm_output_format = args.format
+    if args.compact:
+        scene.rxm_json_compact = True
+    if args.float_digits is not None:
+        scene.rxm_float_digits = args.float_digits
+    if args.indexed:
+        scene.rxm_indexed = True
+    if args.vertex_cache_size is not None:
+        scene.rxm_optimize_vertex_cache = True
+        scene.rxm_vertex_cache_size = args.vertex_cache_size
+    if args.compression is not None:
+        scene.rxm_compression = args.compression
+    if args.compression_level is not None:
+        scene.rxm_compression_level = args.compression_level
+    if args.incremental:
+        scene.rxm_incremental = True
+    if args.pack is not None:
+        scene.rxm_pack = True
+        scene.rxm_pack_file_name = args.pack
+    if args.workers is not None:
+        scene.rxm_export_workers = args.workers
+    if args.memory_limit is not None:
+        scene.rxm_memory_limit = args.memory_limit
+    if args.profile:
+        scene.rxm_profile = True
+
+
+def main(argv: List[str]) -> int:
+    args = get_args(argv)
+    ensure_addon_registered()
+    import raw_export
+
+    scene = bpy.context.scene
+    configure_scene(scene, args)
+    Path(scene.directory).mkdir(parents=True, exist_ok=True)
+
+    result: Dict[str, Any] = {
+        "blend_file": bpy.data.filepath,
+        "object_count": sum(
+            1 for obj in bpy.data.objects if raw_export.object_is_export_eligible(obj)
+        ),
+        "success": True,
+        "error": None,
+    }
+    start = time.perf_counter()
+    try:
+        bpy.ops.object.raw_export_export_all()
+    except RuntimeError as error:
+        result["success"] = False
+        result["error"] = str(error)
+    result["seconds"] = time.perf_counter() - start
 
-def main() -> None:
-    bpy.ops.object.raw_export()
+    if args.report is not None:
+        Path(args.report).write_text(json.dumps(result, indent=4))
+    print("raw_export_runner:", json.dumps(result))
+    return 0 if result["success"] else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []))
@@ -1,18 +1,61 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # Copyright (C) 2023 Aziroshin (Christian Knuchel)
-import json
-import pprint
-from abc import abstractmethod, ABC
-from json import JSONEncoder
+import cProfile
+import gc
+import os
+import time
 from pathlib import Path
-from typing import List, Dict, TypeVar, Type, Literal, TypeAlias, Iterable, TypedDict, \
-    NamedTuple, Any, Tuple
+from typing import List, Dict, Iterable, Any, Tuple, Set, Callable
 
 # Blender
 import bpy
 import bmesh
+import numpy as np
 from bmesh.types import BMesh, BMVert, BMFace, BMLayerItem
-from mathutils import Vector
+from mathutils import Matrix, Vector
+
+if "core" in locals():
+    # Reloading the addon (e.g. with "Reload Scripts") only reloads this
+    # module otherwise.
+    import importlib
+    importlib.reload(core)
+from . import core
+from .core import (
+    AllJSONEncoders,
+    BasicMaterialData,
+    DefaultMaterialData,
+    ExportManifest,
+    ExportProfiler,
+    ExportSettings,
+    ImageTextureMaterialData,
+    InstanceReference,
+    MemoryMonitor,
+    MaterialData,
+    ObjectData,
+    ObjectExportJob,
+    ObjectWriterPool,
+    Quantization,
+    RXM_COMPRESSED_FILE_SUFFIX,
+    RXM_CPROFILE_FILE_NAME,
+    RXM_MANIFEST_FILE_NAME,
+    RXM_PACK_FILE_SUFFIX,
+    RXM_PROFILE_FILE_NAME,
+    RawExportError,
+    VertexCacheStats,
+    ZLIB_MAX_LEVEL,
+    ensure_compression_available,
+    extract_object_data,
+    extract_triangulated_object_data,
+    get_equally_split_list,
+    get_export_content_hash,
+    get_instance_content_hash,
+    get_instance_record_path,
+    get_output_file_paths,
+    get_written_path,
+    get_worker_count,
+    write_object_file,
+    write_pack,
+)
 
 bl_info = {
     "name": "raw_export",
@@ -23,17 +66,12 @@ bl_info = {
     "warning": "This might break all your things."
 }
 
-T = TypeVar("T")
-
 ###########################################################################
 
 
 ###########################################################################
 # Config
 ###########################################################################
-DEVFIXTURE_output_path = "../../../../assets/parts/raw_export_test_cube.json"
-DEVFIXTURE_debugging_cube = False
-###########################################################################
 DOC_PATH_EXPLAINER =\
     "\n\nConfigured "\
     + "sub-directories of all parenting collections as well as the "\
@@ -71,380 +109,68 @@ def iterable4_to_vector(iterable: Iterable) -> Vector:
     return Vector((item for item in iterable))
 
 
-def get_all_uv_coords() -> List[Vector]:
-    # This snippet looks promising, based on:
-    # https://blender.stackexchange.com/questions/3532/obtain-uv-selection-in-python
-    bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.context.object.update_from_editmode()
-
-    mesh: bpy.types.Mesh = bpy.context.object.data
-    uv_map: bpy.types.MeshUVLoopLayer = mesh.uv_layers.active
-    all_uv_coords: list[Vector] = [uv_coord.vector for uv_coord in uv_map.uv]
-
-    return all_uv_coords
-
-
-class FractionalListSplitError(Exception):
-    pass
-
-
-def get_equally_split_list(unsplit_list: list[T], part_len: int) -> list[list[T]]:
-    part_count = len(unsplit_list)
-    if not part_count % part_len == 0:
-        raise FractionalListSplitError(
-            f"part_len(%s) is not a multiple of the number of items\
-            in unsplit_list (%s)." % part_len, part_count
-        )
-    part_group_count = int(part_count / part_len)
-    return [
-        unsplit_list[part_len*g:part_len*g+part_len]
-        for g in range(part_group_count)
-    ]
-
-
 def get_frozen_vector_copy(vector: Vector) -> Vector:
     vector_copy = vector.copy()
     vector_copy.freeze()
     return vector_copy
 
 
-class JSONSerializable:
-    # TODO: Might want to make this an OrderedDict, so the
-    #   resulting JSON is always the same, no matter what.
-    @abstractmethod
-    def __to_json_serializable__(self):
-        pass
-
-
-class JSONVectorEncoder(JSONEncoder):
-    def default(self, vector):
-        if isinstance(vector, Vector):
-            try:
-                vector.z
-            except AttributeError:
-                # 2D Vector.
-                return vector.x, vector.y
-
-            try:
-                vector.w
-            except AttributeError:
-                # 3D Vector.
-                return vector.x, vector.y, vector.z
-
-            # 4D Vector.
-            return vector.x, vector.y, vector.z, vector.w
-
-        # We try this last, just for the (albeit unlikely) case that
-        # JSONEncoder all of a sudden gets support for mathutils.Vector
-        # one day, in which case it would get serialized by that
-        # instead, with potentially slight differences in schema,
-        # which could result in weird bugs.
-        return super().default(vector)
-
-
-class JSONEncoderByMethod(JSONEncoder):
-    def default(self, item):
-        if hasattr(item, "__to_json_serializable__"):
-            return item.__to_json_serializable__()
-
-        return super().default(item)
-
-
-TJSONEncoder = TypeVar("TJSONEncoder", bound=JSONEncoder, covariant=True)
-
-
-class EmptyJSONEncoderChainError(Exception):
-    pass
-
-
-class JSONEncoderChain(JSONEncoder):
-    @staticmethod
-    @abstractmethod
-    def encoder_classes() -> List[Type[TJSONEncoder]]:
-        return []
-
-    encoders: List[JSONEncoder] = []
-
-    def __init__(
-        self,
-        *,
-        skipkeys=False,
-        ensure_ascii=True,
-        check_circular=True,
-        allow_nan=True,
-        sort_keys=False,
-        indent=None,
-        separators=None,
-        default=None
-    ):
-        super().__init__(
-            skipkeys=skipkeys,
-            ensure_ascii=ensure_ascii,
-            check_circular=check_circular,
-            allow_nan=allow_nan,
-            sort_keys=sort_keys,
-            indent=indent,
-            separators=separators,
-            default=default
-        )
-        for encoder_class in self.encoder_classes():
-            self.encoders.append(
-                encoder_class(
-                    skipkeys=skipkeys,
-                    ensure_ascii=ensure_ascii,
-                    check_circular=check_circular,
-                    allow_nan=allow_nan,
-                    sort_keys=sort_keys,
-                    indent=indent,
-                    separators=separators,
-                    default=default
-                )
-            )
-
-    def default(self, item):
-        encoders_tried = 0
-        for encoder in self.encoders:
-            try:
-                return encoder.default(item)
-            except TypeError as error:
-                encoders_tried += 1
-                if encoders_tried < len(self.encoders):
-                    continue
-                else:
-                    # This is the last encoder, so we're out of options.
-                    raise error
-
-        raise EmptyJSONEncoderChainError(
-            f"There are no encoders defined for {self.__class__.__name__}."
-        )
-
-
-class AllJSONEncoders(JSONEncoderChain):
-    @staticmethod
-    def encoder_classes() -> List[Type[TJSONEncoder]]:
-        # TODO [bug,typing]: The return value's typing doesn't seem to work,
-        #   e.g. adding a number to the list doesn't result in an error.
-        return [
-            JSONVectorEncoder,
-            JSONEncoderByMethod,
-            JSONEncoder
-        ]
-
-
-def get_linked_output_nodes(node: bpy.types.Node) -> List[bpy.types.Node]:
-    linked_output_nodes: List[bpy.types.Node] = []  # Type: https://docs.blender.org/api/current/bpy.types.Node.html#bpy.types.Node
-
-    outputs: bpy.types.NodeOutputs = node.outputs  # Type: https://docs.blender.org/api/current/bpy.types.NodeOutputs.html#bpy.types.NodeOutputs
-    for output in node.outputs:
-        for link in output.links:
-            # TODO: Traverse the `to_node`s of link until a
-            #   valid end node is found. Only a valid end
-            #   node will make this a valid image texture
-            #   for export.
-
-            # The type of `link` is `NodeLink`.
-            link: bpy.types.NodeLink = link
-            linked_output_nodes.append(link.to_node)
-    return linked_output_nodes
-
-
-def get_end_nodes(node: bpy.types.Node) -> List[bpy.types.Node]:
-    end_nodes: List[bpy.types.Node] = []  # Type: https://docs.blender.org/api/current/bpy.types.Node.html#bpy.types.Node
-
-    for linked_output_node in get_linked_output_nodes(node):
-        end_nodes += get_end_nodes(linked_output_node)
+def get_nodes_feeding_material_output(node_tree: bpy.types.NodeTree) -> Set[str]:
+    """Names of the nodes whose outputs ultimately feed into a "Material
+    Output" node. Walks the links backwards from the output nodes, visiting
+    every node at most once."""
+    # Type of the nodes: https://docs.blender.org/api/current/bpy.types.Node.html#bpy.types.Node
+    input_nodes: Dict[str, List[bpy.types.Node]] = {}
+    for link in node_tree.links:
+        input_nodes.setdefault(link.to_node.name, []).append(link.from_node)
 
-    if len(end_nodes) == 0:  # Outputs not linked to any nodes.
-        end_nodes.append(node)
-
-    return end_nodes
-
-
-MaterialDataTypeStr: TypeAlias = Literal[
-    "DEFAULT",
-    "BASIC",
-    "IMAGE_FILES"
-]
-
-
-# TODO: Add a __repr__.
-class MaterialData(ABC, JSONSerializable):
-    type: MaterialDataTypeStr
-    index: int
-    name: str
-
-
-class DefaultMaterialData(MaterialData):
-
-    def __init__(self, index: int):
-        self.type = "DEFAULT"
-        self.index = index
-        self.name = "Default"
-
-    def __to_json_serializable__(self):
-        return {
-            "index": self.index,
-            "type": self.type,
-            "name": self.name,
-        }
-
-
-class BasicMaterialData(MaterialData):
-    color: Vector
-
-    def __init__(self, index: int, name: str, color: Vector):
-        self.type = "BASIC"
-        self.index = index
-        self.name = name
-        self.color = color
-
-    def __to_json_serializable__(self):
-        return {
-            "index": self.index,
-            "type": self.type,
-            "name": self.name,
-            "color": self.color
-        }
-
-
-class ImageTextureMaterialData(MaterialData):
-    filenames: List[str]
-
-    def __init__(self, index: int, name: str, filenames: List[str] = []):
-        self.type = "IMAGE_FILES"
-        self.index = index
-        self.name = name
-        self.filenames = filenames
-
-    def add_file_name(self, filename: str) -> None:
-        self.filenames.append(filename)
-
-    def __to_json_serializable__(self):
-        return {
-            "index": self.index,
-            "type": self.type,
-            "name": self.name,
-            "filenames": self.filenames
-        }
-
-
-class DebugCubeTriDict(TypedDict):
-    axis: Literal["x", "y", "z"]
-    axis_sign: Literal["+", "-"]
-    vertices: List[Vector]
-    uvs: List[Vector]
-    material_index: int
-
-
-class DebugCubeFaceDict(TypedDict):
-    tris: List[DebugCubeTriDict]
-
-
-class DebugCubeSideDict(TypedDict):
-    faces_match: bool
-    faces: List[DebugCubeFaceDict]
-
-
-class AxisSignInfo(NamedTuple):
-    axis: Literal["x", "y", "z"]
-    sign: Literal["+", "-"]
+    pending_nodes = [
+        node for node in node_tree.nodes if type(node) == bpy.types.ShaderNodeOutputMaterial
+    ]
+    feeding_node_names = {node.name for node in pending_nodes}
+    while pending_nodes:
+        for input_node in input_nodes.get(pending_nodes.pop().name, []):
+            if input_node.name not in feeding_node_names:
+                feeding_node_names.add(input_node.name)
+                pending_nodes.append(input_node)
+    return feeding_node_names
+
+
+def material_uses_normal_map(material: bpy.types.Material | None) -> bool:
+    """Whether a tangent space "Normal Map" node with a linked color feeds
+    into the "Material Output" of `material`, that is, whether its normal
+    map needs tangents to be shaded."""
+    if material is None or not material.use_nodes:
+        return False
+    feeding_node_names = get_nodes_feeding_material_output(material.node_tree)
+    return any(
+        type(node) == bpy.types.ShaderNodeNormalMap
+        and node.space == "TANGENT"
+        and node.inputs["Color"].is_linked
+        and node.name in feeding_node_names
+        for node in material.node_tree.nodes
+    )
 
 
-def get_cube_same_sign_axis_info(vectors: List[Vector]) -> AxisSignInfo:
-    """Determines axis and sign of a test cube side by a list of vectors.
-    This strictly assumes a cube centered on the world origin with each side
-    being made up of two triangles. Behaviour outside these parameters is
-    undefined."""
+def object_needs_tangents(obj: bpy.types.Object) -> bool:
+    return any(material_uses_normal_map(slot.material) for slot in obj.material_slots)
 
-    axes: List[Literal["x"], Literal["y"], Literal["z"]] = ["x", "y", "z"]
-    columns: List[List[float]] = [
-        [vectors[0].x, vectors[1].x, vectors[2].x],
-        [vectors[0].y, vectors[1].y, vectors[2].y],
-        [vectors[0].z, vectors[1].z, vectors[2].z]
-    ]
 
-    i_axes = 0
-    for column in columns:
-        if all(map(lambda component: component > 0, column)):
-            return AxisSignInfo(axes[i_axes], "+")
-        elif all(map(lambda component: component < 0, column)):
-            return AxisSignInfo(axes[i_axes], "-")
-        i_axes += 1
-
-
-def generate_cube_debug_side_list(pre_json: Dict) -> List[DebugCubeSideDict]:
-    sides: List[DebugCubeSideDict] = []
-    pre_json_vertices: List[Vector] = pre_json["vertices"]
-    pre_json_uvs: List[Vector] = pre_json["uvs"]
-    pre_json_material_indices: List[int] = pre_json["material_indices"]
-    vertex_count = len(pre_json_vertices)
-
-    if not vertex_count % 6 == 0:
-        raise TypeError(
-            "Number of vertices must be divisible by 6, "
-            "as one side consists of two tris (with two overlapping)."
-        )
+def triangulate_ngons(mesh: bpy.types.Mesh) -> None:
+    """Triangulates the faces of `mesh` with more than 4 corners, in
+    place, so it's meant for temporary meshes (`Object.to_mesh`)."""
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    if not np.any(loop_totals > 4):
+        return
+    bm: BMesh = bmesh.new()
+    try:
+        bm.from_mesh(mesh)
+        bmesh.ops.triangulate(bm, faces=[face for face in bm.faces if len(face.verts) > 4])
+        bm.to_mesh(mesh)
+    finally:
+        bm.free()
 
-    side_count = int(vertex_count / 6)
-    for i_side in range(side_count):
-        verts: List[Vector] = [pre_json_vertices[6*i_side+i] for i in range(6)]
-        uvs: List[Vector] = [pre_json_uvs[6*i_side+i] for i in range(6)]
-        material_indices = [pre_json_material_indices[2*i_side+i] for i in range(2)]
-        print(i_side)
-        tri1_axis_sign_info: AxisSignInfo =\
-            get_cube_same_sign_axis_info(verts[:3])
-        tri2_axis_sign_info: AxisSignInfo =\
-            get_cube_same_sign_axis_info(verts[3:])
-
-        sides.append({
-                "faces_match": tri1_axis_sign_info == tri1_axis_sign_info,
-                "faces": [
-                    {
-                        "axis": tri1_axis_sign_info.axis,
-                        "axis_sign": tri1_axis_sign_info.sign,
-                        "vertices": verts[:3],
-                        "uvs": uvs[:3],
-                        "material_index": material_indices[0]
-                    },
-                    {
-                        "axis": tri2_axis_sign_info.axis,
-                        "axis_sign": tri2_axis_sign_info.sign,
-                        "vertices": verts[3:],
-                        "uvs": uvs[3:],
-                        "material_index": material_indices[1]
-                    },
-                ]
-        })
-
-    return sides
-
-
-class ObjectData:
-    vertices: List[Vector]
-    normals: List[Vector]
-    uvs: List[Vector]
-    indices: List[int]
-    material_indices: List[int]
-    poly_size: int
-
-    def __init__(
-            self,
-            *,
-            vertices: List[Vector] | None = None,
-            normals: List[Vector] | None = None,
-            uvs: List[Vector] | None = None,
-            indices: List[int] | None = None,
-            material_indices: List[int] | None = None,
-            poly_size: int = -1,
-    ):
-        self.vertices = [] if vertices is None else vertices
-        self.normals = [] if normals is None else normals
-        self.uvs = [] if uvs is None else uvs
-        # TODO: Pretty sure indices are broken right now, since the vertices are
-        #  ordered differently. See what's going on, and if required, fix.
-        self.indices = [] if indices is None else indices
-        self.material_indices = [] if material_indices is None else material_indices
-        self.poly_size = poly_size
 
 
 def debug_print_mesh_faces(mesh: BMesh, object_data: ObjectData):
@@ -455,7 +181,7 @@ def debug_print_mesh_faces(mesh: BMesh, object_data: ObjectData):
 
         for bmvert in face.verts:
             vert_face = bmvert_location_as_vector(bmvert)
-            vert_object_data = object_data.vertices[i_vert]
+            vert_object_data = Vector(object_data.vertices[3*i_vert:3*i_vert+3])
             are_identical = vert_face == vert_object_data
             print("\t", vert_face, "\t|||", vert_object_data, "\t|||", "identical:", are_identical)
             i_vert += 1
@@ -463,23 +189,143 @@ def debug_print_mesh_faces(mesh: BMesh, object_data: ObjectData):
         i_face += 1
 
 
-class Face:
-    vertices: List[Vector]
-    uvs: List[Vector]
-    normals: List[Vector]
-    material_index: int
+def extract_object_data_bmesh(obj: bpy.types.Object, poly_size: int) -> ObjectData:
+    """The original, BMesh-based extraction. Slow, since it visits every
+    corner in Python, but kept around as the reference the bulk extraction
+    (`extract_object_data`) is benchmarked and checked against."""
+    obj_mesh: bpy.types.Mesh = obj.to_mesh()
+    object_data = ObjectData(
+        vertex_count=len(obj_mesh.loops),
+        face_count=len(obj_mesh.polygons),
+        poly_size=poly_size
+    )
+    mesh: BMesh = bmesh.new()
+    try:
+        mesh.from_mesh(obj_mesh)
+        fill_object_data_from_bmesh(object_data, mesh)
+    finally:
+        mesh.free()
+        obj.to_mesh_clear()
+    return object_data
+
+
+def fill_object_data_from_bmesh(object_data: ObjectData, mesh: BMesh) -> None:
+    uv_layer: BMLayerItem | None = mesh.loops.layers.uv.active
+
+    # Each loop is one corner of its face, so everything per corner,
+    # including its UV, is right there without looking at other faces.
+    i_corner = 0
+    for i_face, bmface in enumerate(mesh.faces):
+        bmface: BMFace = bmface
+
+        for loop in bmface.loops:
+            object_data.set_corner(
+                i_corner,
+                loop.vert.co,
+                loop.vert.normal,
+                None if uv_layer is None else loop[uv_layer].uv
+            )
+            i_corner += 1
+
+        object_data.material_indices[i_face] = bmface.material_index
+
+
+def get_material_state_key(material: bpy.types.Material) -> Tuple[Any, ...]:
+    """Everything `resolve_material_data` depends on, so a changed node tree
+    never resolves from the cache."""
+    if not material.use_nodes:
+        return material.name_full, False, tuple(material.diffuse_color)
+    return (
+        material.name_full,
+        True,
+        # For node trees without images (see `resolve_material_data`).
+        tuple(material.diffuse_color),
+        tuple(
+            (
+                node.name,
+                node.bl_idname,
+                node.image.filepath if type(node) == bpy.types.ShaderNodeTexImage and node.image else None
+            )
+            for node in material.node_tree.nodes
+        ),
+        tuple((link.from_node.name, link.to_node.name) for link in material.node_tree.links),
+    )
+
+
+def resolve_material_data(material: bpy.types.Material, index: int) -> MaterialData:
+    # The "use_nodes"-case is currently solely focused on getting image paths.
+    if material.use_nodes:
+        # Make sure the images aren't from some disconnected node (like one
+        # for normal baking), but from ones that ultimately feed into a
+        # "Material Output" node.
+        feeding_node_names = get_nodes_feeding_material_output(material.node_tree)
+        filenames = [
+            Path(node.image.filepath).name
+            for node in material.node_tree.nodes  # node:  bpy.types.Node
+            if type(node) == bpy.types.ShaderNodeTexImage
+            and node.image is not None
+            and node.name in feeding_node_names
+        ]
+        # Without an image, the viewport color is all there is to go by.
+        if filenames:
+            return ImageTextureMaterialData(index=index, name=material.name, filenames=filenames)
+    return BasicMaterialData(
+        index=index,
+        name=material.name,
+        color=iterable4_to_vector(material.diffuse_color)
+    )
 
-    def __init__(
-            self,
-            vertices: List[Vector],
-            uvs: List[Vector],
-            normals: List[Vector],
-            material_index: int
-    ):
-        self.vertices = vertices
-        self.uvs = uvs
-        self.normals = normals
-        self.material_index = material_index
+
+class MaterialDataCache:
+    """Resolves the `MaterialData` of each material (in each slot index)
+    once, for all objects sharing it. Keyed by the state of the material,
+    see `get_material_state_key`."""
+    hits: int
+    misses: int
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._material_data: Dict[Tuple[Any, ...], MaterialData] = {}
+
+    def get_material_data(self, material: bpy.types.Material, index: int) -> MaterialData:
+        key = (index, *get_material_state_key(material))
+        try:
+            material_data = self._material_data[key]
+        except KeyError:
+            self.misses += 1
+            material_data = self._material_data[key] = resolve_material_data(material, index)
+        else:
+            self.hits += 1
+        return material_data
+
+
+def get_object_material_data(
+        obj: bpy.types.Object,
+        material_cache: MaterialDataCache | None = None
+) -> List[MaterialData]:
+    """One `MaterialData` per material slot of `obj`."""
+    if material_cache is None:
+        material_cache = MaterialDataCache()
+
+    # material_slots: List[MaterialSlot]
+    return [
+        material_cache.get_material_data(slot.material, index)
+        if slot.material else DefaultMaterialData(index=index)
+        for index, slot in enumerate(obj.material_slots)
+    ]
+
+
+def get_export_settings(scene: bpy.types.Scene) -> ExportSettings:
+    return ExportSettings(
+        output_format=scene.rxm_output_format,
+        json_compact=scene.rxm_json_compact,
+        float_digits=scene.rxm_float_digits,
+        indexed=scene.rxm_indexed,
+        vertex_cache_size=scene.rxm_vertex_cache_size if scene.rxm_optimize_vertex_cache else 0,
+        compression=scene.rxm_compression,
+        compression_level=scene.rxm_compression_level
+    )
 
 
 class RawExportPersistentStore(bpy.types.PropertyGroup):
@@ -498,10 +344,6 @@ def get_ephemeral_store(context: bpy.types.Context) -> RawExportEphemeralStore:
     return context.window_manager.ephemeral_store
 
 
-class RawExportError(Exception):
-    pass
-
-
 class OBJECT_PT_raw_export_file_export_panel(bpy.types.Panel):
     bl_label = "File Export"
     bl_space_type = "VIEW_3D"
@@ -514,6 +356,16 @@ class OBJECT_PT_raw_export_file_export_panel(bpy.types.Panel):
         row.operator("object.raw_export_export_object", text="Object")
         row.operator("object.raw_export_export_collection", text="Collection")
         col.operator("object.raw_export_export_all", text="All")
+        row = self.layout.row(align=True)
+        row.prop(context.scene, "rxm_modal_export")
+        sub = row.row(align=True)
+        sub.enabled = context.scene.rxm_modal_export
+        sub.prop(context.scene, "rxm_modal_time_budget")
+        row = self.layout.row(align=True)
+        row.prop(context.scene, "rxm_live_export")
+        sub = row.row(align=True)
+        sub.enabled = context.scene.rxm_live_export
+        sub.prop(context.scene, "rxm_live_export_delay")
 
 
 class OBJECT_PT_raw_export_settings_panel(bpy.types.Panel):
@@ -524,6 +376,32 @@ class OBJECT_PT_raw_export_settings_panel(bpy.types.Panel):
 
     def draw(self, context):
         self.layout.prop(context.scene, "directory")
+        row = self.layout.row(align=True)
+        row.prop(context.scene, "rxm_compression")
+        row.prop(context.scene, "rxm_compression_level")
+        self.layout.prop(context.scene, "rxm_output_format")
+        self.layout.prop(context.scene, "rxm_json_compact")
+        self.layout.prop(context.scene, "rxm_float_digits")
+        self.layout.prop(context.scene, "rxm_indexed")
+        row = self.layout.row(align=True)
+        row.enabled = context.scene.rxm_indexed
+        row.prop(context.scene, "rxm_optimize_vertex_cache")
+        sub = row.row(align=True)
+        sub.enabled = context.scene.rxm_optimize_vertex_cache
+        sub.prop(context.scene, "rxm_vertex_cache_size")
+        self.layout.prop(context.scene, "rxm_tangents")
+        self.layout.prop(context.scene, "rxm_incremental")
+        self.layout.prop(context.scene, "rxm_instancing")
+        row = self.layout.row(align=True)
+        row.prop(context.scene, "rxm_pack")
+        sub = row.row(align=True)
+        sub.enabled = context.scene.rxm_pack
+        sub.prop(context.scene, "rxm_pack_file_name", text="")
+        self.layout.prop(context.scene, "rxm_export_workers")
+        self.layout.prop(context.scene, "rxm_memory_limit")
+        row = self.layout.row(align=True)
+        row.prop(context.scene, "rxm_profile")
+        row.prop(context.scene, "rxm_profile_cprofile")
 
 
 class OBJECT_PT_raw_export_collection_panel(bpy.types.Panel):
@@ -539,6 +417,14 @@ class OBJECT_PT_raw_export_collection_panel(bpy.types.Panel):
 
     def draw(self, context):
         self.layout.prop(context.collection, "rxm_sub_dir_path")
+        self.layout.prop(context.collection, "rxm_quantize")
+        col = self.layout.column()
+        col.enabled = context.collection.rxm_quantize
+        col.prop(context.collection, "rxm_position_encoding")
+        if context.collection.rxm_position_encoding == "GRID":
+            col.prop(context.collection, "rxm_position_precision")
+        col.prop(context.collection, "rxm_uv_encoding")
+        col.prop(context.collection, "rxm_normal_encoding")
 
 
 class OBJECT_PT_raw_export_panel(bpy.types.Panel):
@@ -557,30 +443,87 @@ class OBJECT_PT_raw_export_panel(bpy.types.Panel):
         self.layout.prop(context.object, "rxm_file_name")
 
 
-# Some interesting info: https://b3d.interplanety.org/en/parent-collection/
-def get_collection_parent_collections(
-        prospective_collection: bpy.types.Collection,
-        available_collections,
-        found_collections: List[bpy.types.Collection]
-) -> List[bpy.types.Collection]:
-    for collection in available_collections:
-        if prospective_collection.name in collection.children.keys():
-            found_collections.append(collection)
-            available_collections.remove(collection)
-            get_collection_parent_collections(
-                collection,
-                available_collections,
-                found_collections
+class CollectionIndex:
+    """Maps each collection to its parent collection, built once per export
+    run, so resolving the collections of an object doesn't search through
+    all collections. Also caches the output paths resolved with it.
+    A collection linked into several collections gets the first of them as
+    its parent, in the order of `[scene.collection] + bpy.data.collections`."""
+    scene_collection: bpy.types.Collection
+    parents: Dict[str, bpy.types.Collection]
+    file_paths: Dict[str, str]
+
+    def __init__(self, scene: bpy.types.Scene):
+        self.scene_collection = scene.collection
+        self.parents = {}
+        self.file_paths = {}
+        for collection in [scene.collection, *bpy.data.collections]:
+            for child in collection.children:
+                self.parents.setdefault(child.name_full, collection)
+
+    def get_collection_ancestry(self, collection: bpy.types.Collection) -> List[bpy.types.Collection]:
+        """`collection` and its parents, nearest first."""
+        ancestry = [collection]
+        while ancestry[-1].name_full in self.parents:
+            ancestry.append(self.parents[ancestry[-1].name_full])
+        return ancestry
+
+    def get_object_collections(self, obj: bpy.types.Object) -> List[bpy.types.Collection]:
+        """The collection `obj` belongs to and its parents, nearest first.
+        Of several collections `obj` is linked into, those in the scene
+        win, and of those, the one whose names from the top sort first."""
+        ancestries = [
+            self.get_collection_ancestry(collection) for collection in obj.users_collection
+        ]
+        if not ancestries:
+            return []
+        return min(ancestries, key=lambda ancestry: (
+            ancestry[-1] != self.scene_collection,
+            [collection.name_full for collection in reversed(ancestry)]
+        ))
+
+
+def get_object_quantization(
+        obj: bpy.types.Object,
+        collection_index: CollectionIndex
+) -> Quantization | None:
+    """From the nearest of the object's collections with quantization
+    enabled, if any."""
+    for collection in collection_index.get_object_collections(obj):
+        if collection.rxm_quantize:
+            return Quantization(
+                positions=collection.rxm_position_encoding,
+                position_precision=collection.rxm_position_precision,
+                uvs=collection.rxm_uv_encoding,
+                normals=collection.rxm_normal_encoding
             )
-    return found_collections
+    return None
+
+
+def get_instance_key(obj: bpy.types.Object, settings: ExportSettings) -> Tuple[Any, ...] | None:
+    """Objects with the same key export to the same files, so only the
+    first of them needs to be written. `None` for objects whose evaluated
+    geometry might differ from that of others sharing their mesh."""
+    if obj.type != "MESH" or len(obj.modifiers) > 0:
+        return None
+    return (
+        obj.data.name_full,
+        tuple(
+            slot.material.name_full if slot.material else None
+            for slot in obj.material_slots
+        ),
+        settings
+    )
 
 
-def get_object_parent_collections(obj) -> List[bpy.types.Collection]:
-    return get_collection_parent_collections(
-        obj.users_collection[0],
-        [bpy.context.scene.collection] + [c for c in bpy.data.collections],
-        [obj.users_collection[0]]
-    )
+def object_may_be_instance(obj: bpy.types.Object) -> bool:
+    """Whether `obj` may be written as an instance record (see
+    `get_instance_key`), which holds its transform."""
+    return obj.type == "MESH" and len(obj.modifiers) == 0 and obj.data.users > 1
+
+
+def get_matrix_rows(matrix: Matrix) -> Tuple[float, ...]:
+    return tuple(value for row in matrix for value in row)
 
 
 def object_is_export_eligible(obj: bpy.types.Object) -> bool:
@@ -591,37 +534,343 @@ def object_is_export_eligible(obj: bpy.types.Object) -> bool:
     return True
 
 
-def get_obj_file_path(context, obj) -> str:
+def get_obj_file_path(context, obj, collection_index: CollectionIndex | None = None) -> str:
+    if collection_index is None:
+        collection_index = CollectionIndex(context.scene)
+    elif obj.name_full in collection_index.file_paths:
+        return collection_index.file_paths[obj.name_full]
     base_path: str = context.scene.directory
 
     path_elements: List[str] = [
-        c.rxm_sub_dir_path for c in get_object_parent_collections(obj)
+        c.rxm_sub_dir_path for c in collection_index.get_object_collections(obj)
     ]
     path_elements.reverse()
     path_elements.append(obj.rxm_file_name)
     path_elements.insert(0, base_path)
-    return str(Path(*path_elements))
-
-
-def debug_print_test_cube(mesh_pre_json: dict):
-    pprint.pprint(generate_cube_debug_side_list(mesh_pre_json), indent=4)
-    print(mesh_pre_json["material_indices"])
+    file_path = str(Path(*path_elements))
+    collection_index.file_paths[obj.name_full] = file_path
+    return file_path
 
 
 def debug_print_export_object_paths(
         context: bpy.types.Context,
-        objects: List[bpy.types.Object]
+        objects: List[bpy.types.Object],
+        collection_index: CollectionIndex | None = None
 ):
     for obj in objects:
         print("Paths for objects in export queue:", Path(
-            obj.rxm_file_name), get_obj_file_path(context, obj)
+            obj.rxm_file_name), get_obj_file_path(context, obj, collection_index)
               )
 
 
+class ExportRun:
+    """One export of a list of objects: everything set up once per run
+    (settings, caches, writer pool, ...), with objects exported one at a
+    time by `export_object`, so the export can also be spread over the
+    steps of a modal operator. `close` has to be called in any case, then
+    `report_results`."""
+    settings: ExportSettings
+    collection_index: CollectionIndex
+    material_cache: MaterialDataCache
+    manifest: ExportManifest | None
+    profiler: ExportProfiler
+    memory: MemoryMonitor
+    depsgraph: bpy.types.Depsgraph
+    # Instance key -> `file_path` of the first object exported with it.
+    instance_sources: Dict[Tuple[Any, ...], str]
+    cprofile: cProfile.Profile | None
+    writer_pool: ObjectWriterPool
+    exported_objects: List[bpy.types.Object]
+    # Set if the written files go into a pack as well.
+    pack_path: str | None
+    # `file_path` of each exported object -> the files it has (including
+    # up to date ones which weren't written again).
+    output_file_paths: Dict[str, List[str]]
+    # Objects exported differently than asked for, reported with the results.
+    warnings: List[str]
+
+    def __init__(self, context: bpy.types.Context):
+        scene = context.scene
+        self.settings = get_export_settings(scene)
+        ensure_compression_available(self.settings.compression)
+        self.collection_index = CollectionIndex(scene)
+        self.material_cache = MaterialDataCache()
+        self.manifest = None
+        if scene.rxm_incremental:
+            self.manifest = ExportManifest(bpy.path.abspath(scene.directory))
+        self.profiler = ExportProfiler(enabled=scene.rxm_profile)
+        self.memory = MemoryMonitor(scene.rxm_memory_limit * 2**20)
+        # Evaluated once for all objects, so modifiers apply the same way
+        # no matter which object is active or in which mode.
+        self.depsgraph = context.evaluated_depsgraph_get()
+        self.instance_sources = {}
+        self.exported_objects = []
+        self.pack_path = None
+        if scene.rxm_pack:
+            self.pack_path = str(
+                Path(bpy.path.abspath(scene.directory)) / (scene.rxm_pack_file_name + RXM_PACK_FILE_SUFFIX)
+            )
+        self.output_file_paths = {}
+        self.warnings = []
+        self.cprofile = None
+        if scene.rxm_profile_cprofile:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.profiler.start()
+        self.writer_pool = ObjectWriterPool(
+            # While profiling, write in this thread, so that phases don't
+            # overlap.
+            0 if self.profiler.enabled else get_worker_count(scene.rxm_export_workers),
+            profiler=self.profiler
+        )
+
+    def export_object(self, context: bpy.types.Context, obj: bpy.types.Object) -> None:
+        """Extracts `obj` and hands it to the writer pool, unless it's up to
+        date."""
+        self.exported_objects.append(obj)
+        manifest = self.manifest
+        profiler = self.profiler
+        file_path = bpy.path.abspath(get_obj_file_path(context, obj, self.collection_index))
+        object_settings = self.settings._replace(
+            quantization=get_object_quantization(obj, self.collection_index)
+        )
+
+        instance_key: Tuple[Any, ...] | None = None
+        if context.scene.rxm_instancing:
+            instance_key = get_instance_key(obj, object_settings)
+        if instance_key in self.instance_sources:
+            instance = InstanceReference(
+                self.instance_sources[instance_key],
+                get_matrix_rows(obj.matrix_world)
+            )
+            output_file_paths = [
+                get_written_path(get_instance_record_path(file_path, object_settings), object_settings)
+            ]
+            self.output_file_paths[file_path] = output_file_paths
+            content_hash: str | None = None
+            if manifest is not None:
+                content_hash = get_instance_content_hash(file_path, object_settings, instance)
+                if manifest.is_up_to_date(file_path, output_file_paths, content_hash):
+                    return
+            self.writer_pool.submit(ObjectExportJob(
+                file_path,
+                object_settings,
+                None,
+                [],
+                content_hash,
+                instance
+            ))
+            return
+        if instance_key is not None:
+            self.instance_sources[instance_key] = file_path
+
+        # === The Action ===
+        obj_evaluated = obj.evaluated_get(self.depsgraph)
+        with profiler.phase(file_path, "mesh_evaluation"):
+            mesh = obj_evaluated.to_mesh()
+        try:
+            with profiler.phase(file_path, "attribute_extraction"):
+                tangents = context.scene.rxm_tangents and object_needs_tangents(obj)
+                if tangents and mesh.uv_layers.active is None:
+                    tangents = False
+                    self.warnings.append(
+                        f"{obj.name}: Exported without tangents, as it has no UV map."
+                    )
+                if tangents:
+                    # `Mesh.calc_tangents` only takes triangles and quads.
+                    triangulate_ngons(mesh)
+                object_data = extract_triangulated_object_data(mesh, tangents)
+            self.memory.sample(file_path)
+        finally:
+            # Otherwise, the temporary mesh lives until the object
+            # is evaluated again.
+            obj_evaluated.to_mesh_clear()
+            del mesh
+        with profiler.phase(file_path, "material_resolution"):
+            materials = get_object_material_data(obj, self.material_cache)
+
+        output_file_paths = get_output_file_paths(file_path, object_settings)
+        self.output_file_paths[file_path] = output_file_paths
+        content_hash: str | None = None
+        if manifest is not None:
+            content_hash = get_export_content_hash(object_data, materials, object_settings)
+            if manifest.is_up_to_date(file_path, output_file_paths, content_hash):
+                return
+
+        print("CURRENT WORKING DIRECTORY:", os.getcwd())
+        self.writer_pool.submit(ObjectExportJob(
+            file_path,
+            object_settings,
+            object_data,
+            materials,
+            content_hash
+        ))
+        self.memory.sample(file_path)
+        if self.memory.is_exceeded():
+            # Release what the written objects held before
+            # extracting the next one.
+            self.writer_pool.flush()
+            gc.collect()
+            self.memory.flush_count += 1
+
+    def close(
+            self,
+            context: bpy.types.Context,
+            operator_report: Callable[[Set[str], str], Any],
+            cancelled: bool = False
+    ) -> None:
+        """Waits for all files to be written and saves what's kept across
+        runs (manifest, pack, profiles). The pack is left alone if the run
+        was `cancelled` or exported nothing."""
+        writer_pool = self.writer_pool
+        manifest = self.manifest
+        profiler = self.profiler
+        writer_pool.close()
+        if self.pack_path is not None and not cancelled and self.output_file_paths:
+            self.write_pack(context, operator_report)
+        if manifest is not None:
+            for job in writer_pool.written:
+                manifest.update(job.file_path, job.content_hash)
+            manifest.save()
+            operator_report(
+                {ReportTypes.INFO},
+                f"Incremental export: {manifest.hits} unchanged, "
+                f"{manifest.misses} to be written."
+            )
+        debug_print_export_object_paths(context, self.exported_objects, self.collection_index)
+        print(
+            f"Materials: {self.material_cache.misses} resolved, "
+            f"{self.material_cache.hits} reused from the cache."
+        )
+        for key, peak in self.memory.peaks.items():
+            print(f"Peak resident memory: {key} {peak / 2**20:.1f} MiB")
+        profiler.stop()
+        if profiler.enabled:
+            print("Profile written to:", profiler.save(bpy.path.abspath(context.scene.directory)))
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            cprofile_path = Path(bpy.path.abspath(context.scene.directory)) / RXM_CPROFILE_FILE_NAME
+            self.cprofile.dump_stats(cprofile_path)
+            print("cProfile stats written to:", cprofile_path)
+
+    def write_pack(self, context: bpy.types.Context, operator_report: Callable[[Set[str], str], Any]) -> None:
+        """Packs the files of the exported objects, except for those which
+        failed to be written, into the pack of the export directory."""
+        failed_file_paths = {job.file_path for job, _ in self.writer_pool.errors}
+        try:
+            pack_report = write_pack(
+                self.pack_path,
+                bpy.path.abspath(context.scene.directory),
+                {
+                    file_path: [path for path in output_file_paths if os.path.exists(path)]
+                    for file_path, output_file_paths in self.output_file_paths.items()
+                    if file_path not in failed_file_paths
+                }
+            )
+        except (OSError, RawExportError) as error:
+            operator_report({ReportTypes.ERROR}, f"Failed to write the pack {self.pack_path}: {error}")
+            return
+        operator_report(
+            {ReportTypes.INFO},
+            f"Packed {pack_report.updated_count} file(s) into {pack_report.file_path} "
+            f"({pack_report.entry_count} entries, {pack_report.written_size} bytes)."
+        )
+
+    def report_results(self, context: bpy.types.Context, operator_report: Callable[[Set[str], str], Any]) -> None:
+        """Reports what was written, raising a `RawExportError` if anything
+        failed to be."""
+        writer_pool = self.writer_pool
+        settings = self.settings
+        memory = self.memory
+        operator_report(
+            {ReportTypes.INFO},
+            f"Wrote {len(writer_pool.written)} object(s) "
+            f"({sum(1 for job in writer_pool.written if job.instance is not None)} as instances) "
+            f"using {writer_pool.worker_count} worker(s)."
+        )
+        if settings.compression != "NONE" and writer_pool.reports:
+            for report in writer_pool.reports:
+                print(
+                    f"Compressed: {report.file_path} "
+                    f"{report.uncompressed_size / max(report.written_size, 1):.2f}:1 "
+                    f"({report.written_size} bytes) in {report.seconds:.3f}s"
+                )
+            uncompressed_size = sum(report.uncompressed_size for report in writer_pool.reports)
+            written_size = sum(report.written_size for report in writer_pool.reports)
+            operator_report(
+                {ReportTypes.INFO},
+                f"Compressed {uncompressed_size} to {written_size} bytes "
+                f"({uncompressed_size / max(written_size, 1):.2f}:1) with {settings.compression}."
+            )
+        if memory.peaks:
+            operator_report(
+                {ReportTypes.INFO},
+                f"Peak resident memory: {max(memory.peaks.values()) / 2**20:.1f} MiB"
+                + (
+                    f", flushed {memory.flush_count} time(s) at the "
+                    f"{context.scene.rxm_memory_limit} MiB limit."
+                    if memory.flush_count else "."
+                )
+            )
+        elif memory.limit_bytes > 0:
+            operator_report(
+                {ReportTypes.WARNING},
+                "Memory limit ignored: the resident memory can't be determined "
+                "on this system (install psutil into Blender's Python)."
+            )
+        vertex_cache_reports = [
+            report for report in writer_pool.reports if report.vertex_cache_stats is not None
+        ]
+        for report in vertex_cache_reports:
+            stats = report.vertex_cache_stats
+            print(
+                f"Vertex cache: {report.file_path} "
+                f"ACMR {stats.acmr_before:.3f} -> {stats.acmr_after:.3f}, "
+                f"ATVR {stats.atvr_before:.3f} -> {stats.atvr_after:.3f}"
+            )
+        if vertex_cache_reports:
+            means = {
+                field: sum(getattr(report.vertex_cache_stats, field) for report in vertex_cache_reports)
+                / len(vertex_cache_reports)
+                for field in VertexCacheStats._fields
+            }
+            operator_report(
+                {ReportTypes.INFO},
+                f"Mean vertex cache ACMR {means['acmr_before']:.3f} -> {means['acmr_after']:.3f}, "
+                f"ATVR {means['atvr_before']:.3f} -> {means['atvr_after']:.3f}."
+            )
+        quantization_errors: Dict[str, float] = {}
+        for report in writer_pool.reports:
+            if report.quantization_errors:
+                print("Quantization errors:", report.file_path, report.quantization_errors)
+            for name, max_error in report.quantization_errors.items():
+                quantization_errors[name] = max(max_error, quantization_errors.get(name, 0.0))
+        if quantization_errors:
+            operator_report(
+                {ReportTypes.INFO},
+                "Max quantization error: " + ", ".join(
+                    f"{name} {max_error:.3g}{' deg' if name == 'normals' else ''}"
+                    for name, max_error in sorted(quantization_errors.items())
+                )
+            )
+        for warning in self.warnings:
+            operator_report({ReportTypes.WARNING}, warning)
+        if writer_pool.errors:
+            raise RawExportError(
+                "Failed to write: " + ", ".join(
+                    f"{job.file_path} ({error!r})" for job, error in writer_pool.errors
+                )
+            )
+
+
 class OBJECT_OP_raw_export(bpy.types.Operator):
     bl_idname = "object.raw_export"
     bl_label = "raw_export"
 
+    @classmethod
+    def poll(cls, context):
+        return not OBJECT_OP_raw_export_modal.is_running
+
     # This maps the uv-coordinates to their vertices.
     # One uv-coordinate can map to more than one vertex if there are
     # multiple faces that are mapped to the same UV coord.
@@ -636,118 +885,149 @@ class OBJECT_OP_raw_export(bpy.types.Operator):
         # Options
         make_y_up = True
 
-        # Input - prototypal, might come from somewhere else eventually.
-        face_vertex_count = 3
-
-        found_active = context.active_object
         export_queue = get_ephemeral_store(context).export_queue
         objects_to_export: List[bpy.types.Object] = [
             pointer.obj for pointer in export_queue
         ]
-
+        try:
+            run = ExportRun(context)
+        except RawExportError as error:
+            export_queue.clear()
+            self.report({ReportTypes.ERROR}, str(error))
+            return {"CANCELLED"}
+        completed = False
         try:
             for obj in objects_to_export:
-                # Make object active for `get_all_uv_coords` to work right.
-                bpy.context.view_layer.objects.active = obj
-
-                mesh: BMesh = bmesh.new()
-                mesh.from_mesh(obj.to_mesh())
-                uv_layer: BMLayerItem = mesh.loops.layers.uv.active
-
-                object_data = ObjectData(poly_size=face_vertex_count)
-
-                # === The Action ===
-
-                material_index = 0
-                materials_pre_json: List[MaterialData] = []
-
-                # material: bpy.types.Material
-                # material_slots: List[MaterialSlot]
-                for material in [slot.material for slot in obj.material_slots]:
-                    if material:
-                        # The "use_nodes"-case is currently solely focused on getting image paths.
-                        if material.use_nodes:
-                            for node in material.node_tree.nodes:  # node:  bpy.types.Node
-                                if type(node) == bpy.types.ShaderNodeTexImage:
-                                    # Make sure it's not some disconnected node (like one for normal baking),
-                                    # but one that ultimately feeds into a "Material Output" node.
-                                    image_filenames = []
-                                    for end_node in get_end_nodes(node):
-                                        if type(end_node) == bpy.types.ShaderNodeOutputMaterial:
-                                            image_filenames.append(Path(node.image.filepath).name)
-
-                                    materials_pre_json.append(ImageTextureMaterialData(
-                                        index=material_index,
-                                        name=material.name,
-                                        filenames=image_filenames
-                                    ))
-                        else:
-                            materials_pre_json.append(BasicMaterialData(
-                                index=material_index,
-                                name=material.name,
-                                color=iterable4_to_vector(material.diffuse_color)
-                            ))
-                    else:
-                        materials_pre_json.append(DefaultMaterialData(
-                            index=material_index
-                        ))
-
-                    material_index += 1
-
-                all_uv_coords: list[Vector] = get_all_uv_coords()  # They already come sorted by face.
-
-                faces: List[Face] = []
-                for bmface in mesh.faces:
-                    bmface: BMFace = bmface
-                    verts: List[Vector] = []
-                    uvs: List[Vector] = []
-                    normals: List[Vector] = []
-
-                    for vert in bmface.verts:
-                        verts.append(bmvert_location_as_vector(vert))
-                        normals.append(vert.normal)
-
-                        for loop in vert.link_loops:
-                            if loop.face == bmface:
-                                uvs.append(loop[uv_layer].uv)
-
-
-                    faces.append(Face(verts, uvs, normals, bmface.material_index))
-
-                for face in faces:
-                    face: Face = face
-                    object_data.vertices = object_data.vertices + face.vertices
-                    object_data.normals = object_data.normals + face.normals
-                    object_data.uvs = object_data.uvs + face.uvs
-                    object_data.indices = []
-                    object_data.material_indices.append(face.material_index)
-
-                mesh_pre_json = {
-                    "vertices": object_data.vertices,
-                    "normals": object_data.normals,
-                    "uvs": object_data.uvs,
-                    "indices": object_data.indices,
-                    "material_indices": object_data.material_indices,
-                    # List version of `materials`.
-                    "materials": [
-                        materials_pre_json[index] for index in range(material_index)
-                    ]
-                }
-
-                if DEVFIXTURE_debugging_cube:
-                    debug_print_test_cube(mesh_pre_json)
-
-                import os
-                print("CURRENT WORKING DIRECTORY:", os.getcwd())
-                with open(bpy.path.abspath(get_obj_file_path(context, obj)), "w+") as output_file:
-                    output_file.write(json.dumps(mesh_pre_json, cls=AllJSONEncoders, indent=4))
+                run.export_object(context, obj)
+            completed = True
         finally:
             export_queue.clear()
-            bpy.context.view_layer.objects.active = found_active
-            debug_print_export_object_paths(context, objects_to_export)
+            run.close(context, self.report, cancelled=not completed)
+        run.report_results(context, self.report)
         return {"FINISHED"}
 
 
+class OBJECT_OP_raw_export_modal(bpy.types.Operator):
+    """Like `OBJECT_OP_raw_export`, but exports a slice of the queue at a
+    time, from a timer, keeping Blender responsive. Shows its progress in
+    the status bar and can be cancelled with Esc."""
+    bl_idname = "object.raw_export_modal"
+    bl_label = "raw_export (modal)"
+    # Step interval of the timer, the time budget of a step is on top.
+    TIMER_INTERVAL = 0.01
+    # Whether an instance is running, as there's only one export queue.
+    is_running = False
+
+    _run: ExportRun
+    _object_names: List[str]
+    _i_object: int
+    _start: float
+    _timer: bpy.types.Timer | None
+
+    @classmethod
+    def poll(cls, context):
+        return not cls.is_running
+
+    def invoke(self, context, event) -> set[str]:
+        export_queue = get_ephemeral_store(context).export_queue
+        # By name, as objects might be deleted while exporting.
+        self._object_names = [pointer.obj.name_full for pointer in export_queue if pointer.obj]
+        # Taken over entirely; exports started meanwhile get a queue of
+        # their own.
+        export_queue.clear()
+        try:
+            self._run = ExportRun(context)
+        except RawExportError as error:
+            self.report({ReportTypes.ERROR}, str(error))
+            return {"CANCELLED"}
+        self._i_object = 0
+        self._start = time.perf_counter()
+        OBJECT_OP_raw_export_modal.is_running = True
+        context.window_manager.progress_begin(0, max(len(self._object_names), 1))
+        self._timer = context.window_manager.event_timer_add(self.TIMER_INTERVAL, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event) -> set[str]:
+        if event.type == "ESC":
+            self.report(
+                {ReportTypes.WARNING},
+                f"Export cancelled after {self._i_object} of {len(self._object_names)} object(s)."
+            )
+            return self.finish(context, {"CANCELLED"})
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+
+        # At least one object per step, no matter how long it takes.
+        step_end = time.perf_counter() + context.scene.rxm_modal_time_budget / 1000
+        self._run.depsgraph = context.evaluated_depsgraph_get()
+        try:
+            while self._i_object < len(self._object_names):
+                obj = bpy.data.objects.get(self._object_names[self._i_object])
+                self._i_object += 1
+                if obj is not None:
+                    self._run.export_object(context, obj)
+                if time.perf_counter() >= step_end:
+                    break
+        except Exception as error:
+            # Blender doesn't call `cancel` for errors escaping `modal`, so
+            # the timer, status bar and `is_running` would be left behind.
+            self.report(
+                {ReportTypes.ERROR},
+                f"Export failed at {self._object_names[self._i_object - 1]}: {error!r}"
+            )
+            return self.finish(context, {"CANCELLED"})
+
+        if self._i_object >= len(self._object_names):
+            return self.finish(context, {"FINISHED"})
+        context.window_manager.progress_update(self._i_object)
+        context.workspace.status_text_set(self.get_status_text())
+        return {"PASS_THROUGH"}
+
+    def get_status_text(self) -> str:
+        object_count = len(self._object_names)
+        elapsed = time.perf_counter() - self._start
+        remaining = elapsed / max(self._i_object, 1) * (object_count - self._i_object)
+        return (
+            f"RawExport: {self._i_object}/{object_count} objects "
+            f"({100 * self._i_object // max(object_count, 1)}%), "
+            f"about {remaining:.0f}s left. Esc to cancel."
+        )
+
+    def finish(self, context, result: set[str]) -> set[str]:
+        self.cleanup(context)
+        try:
+            self._run.close(context, self.report, cancelled="CANCELLED" in result)
+            self._run.report_results(context, self.report)
+        except RawExportError as error:
+            self.report({ReportTypes.ERROR}, str(error))
+            return {"CANCELLED"}
+        return result
+
+    def cleanup(self, context) -> None:
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        context.window_manager.progress_end()
+        context.workspace.status_text_set(None)
+        OBJECT_OP_raw_export_modal.is_running = False
+
+    def cancel(self, context) -> None:
+        """Called by Blender when it stops the operator itself, e.g. when
+        another file is loaded."""
+        self.cleanup(context)
+        self._run.close(context, self.report, cancelled=True)
+
+
+def export_queued_objects(context: bpy.types.Context) -> None:
+    """With "In Background" set, exports the queue with the modal operator,
+    where there's a window for it."""
+    if context.scene.rxm_modal_export and context.window is not None and not bpy.app.background:
+        bpy.ops.object.raw_export_modal("INVOKE_DEFAULT")
+    else:
+        bpy.ops.object.raw_export()
+
+
 class OBJECT_OP_raw_export_export_object(bpy.types.Operator):
     bl_idname = "object.raw_export_export_object"
     bl_label = "raw_export"
@@ -755,6 +1035,10 @@ class OBJECT_OP_raw_export_export_object(bpy.types.Operator):
             "Export the selected object if it has a filename. "
             + DOC_PATH_EXPLAINER)
 
+    @classmethod
+    def poll(cls, context):
+        return not OBJECT_OP_raw_export_modal.is_running
+
     def execute(self, context):
         store = get_ephemeral_store(context)
         obj = context.active_object
@@ -773,7 +1057,7 @@ class OBJECT_OP_raw_export_export_object(bpy.types.Operator):
                 + "export has to be selected, and it has to be a mesh."
             )
 
-        bpy.ops.object.raw_export()
+        export_queued_objects(context)
         return {"FINISHED"}
 
 
@@ -785,6 +1069,10 @@ class OBJECT_OP_raw_export_export_collection(bpy.types.Operator):
             + "and all sub-collections. "
             + DOC_PATH_EXPLAINER)
 
+    @classmethod
+    def poll(cls, context):
+        return not OBJECT_OP_raw_export_modal.is_running
+
     def execute(self, context):
         store = get_ephemeral_store(context)
         collections =\
@@ -797,7 +1085,7 @@ class OBJECT_OP_raw_export_export_collection(bpy.types.Operator):
                     obj_pointer: ObjectPointer = store.export_queue.add()
                     obj_pointer.obj = obj
 
-        bpy.ops.object.raw_export()
+        export_queued_objects(context)
         return {"FINISHED"}
 
 
@@ -808,6 +1096,10 @@ class OBJECT_OP_raw_export_export_all(bpy.types.Operator):
             "Export all objects with a filename. "
             + DOC_PATH_EXPLAINER)
 
+    @classmethod
+    def poll(cls, context):
+        return not OBJECT_OP_raw_export_modal.is_running
+
     def execute(self, context):
         store = get_ephemeral_store(context)
 
@@ -816,14 +1108,132 @@ class OBJECT_OP_raw_export_export_all(bpy.types.Operator):
                 obj_pointer: ObjectPointer = store.export_queue.add()
                 obj_pointer.obj = obj
 
-        bpy.ops.object.raw_export()
+        export_queued_objects(context)
         return {"FINISHED"}
 
 
+###########################################################################
+# Live export
+###########################################################################
+class LiveExportState:
+    """Objects changed since the last live export, by `name_full`, and when
+    the latest change was seen, so bursts of edits are exported once."""
+    pending: Set[str]
+    last_change: float
+    exporting: bool
+
+    def __init__(self):
+        self.pending = set()
+        self.last_change = 0.0
+        self.exporting = False
+
+
+live_export_state = LiveExportState()
+
+
+def get_objects_using_materials(material_names: Set[str]) -> List[bpy.types.Object]:
+    return [
+        obj for obj in bpy.data.objects
+        if any(
+            slot.material is not None and slot.material.name_full in material_names
+            for slot in obj.material_slots
+        )
+    ]
+
+
+@bpy.app.handlers.persistent
+def on_depsgraph_update_post(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph) -> None:
+    """Collects the export-eligible objects whose geometry or materials
+    changed. Transforms alone only matter for objects that may be written
+    as instance records, as objects are exported in their local space."""
+    if not scene.rxm_live_export or live_export_state.exporting:
+        return
+
+    changed_objects: List[bpy.types.Object] = []
+    changed_material_names: Set[str] = set()
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object):
+            obj = update.id.original
+            if update.is_updated_geometry or update.is_updated_shading:
+                changed_objects.append(obj)
+            elif update.is_updated_transform and scene.rxm_instancing and object_may_be_instance(obj):
+                changed_objects.append(obj)
+        elif isinstance(update.id, bpy.types.Material):
+            changed_material_names.add(update.id.original.name_full)
+        elif isinstance(update.id, bpy.types.ShaderNodeTree):
+            # Editing nodes updates the node tree of the material rather
+            # than the material itself.
+            changed_material_names.update(
+                material.name_full for material in bpy.data.materials
+                if material.node_tree is not None
+                and material.node_tree.original == update.id.original
+            )
+    if changed_material_names:
+        changed_objects += get_objects_using_materials(changed_material_names)
+
+    dirty_names = {obj.name_full for obj in changed_objects if object_is_export_eligible(obj)}
+    if not dirty_names:
+        return
+    live_export_state.pending.update(dirty_names)
+    live_export_state.last_change = time.monotonic()
+    # Not cached in `live_export_state`, as loading a file drops timers.
+    if not bpy.app.timers.is_registered(live_export_timer):
+        bpy.app.timers.register(live_export_timer, first_interval=scene.rxm_live_export_delay)
+
+
+def live_export_timer() -> float | None:
+    """Waits until no change has been seen for `rxm_live_export_delay`
+    seconds, then exports the pending objects."""
+    scene = bpy.context.scene
+    waited = time.monotonic() - live_export_state.last_change
+    if waited < scene.rxm_live_export_delay:
+        return scene.rxm_live_export_delay - waited
+    if OBJECT_OP_raw_export_modal.is_running:
+        # The modal export owns the export queue until it's done, so the
+        # pending objects wait for it.
+        return scene.rxm_live_export_delay
+
+    export_queue = get_ephemeral_store(bpy.context).export_queue
+    for name in sorted(live_export_state.pending):
+        obj = bpy.data.objects.get(name)
+        # Might have been deleted, renamed or hidden in the meantime.
+        if obj is not None and object_is_export_eligible(obj):
+            obj_pointer: ObjectPointer = export_queue.add()
+            obj_pointer.obj = obj
+    live_export_state.pending.clear()
+    if not scene.rxm_live_export or len(export_queue) == 0:
+        export_queue.clear()
+        return None
+
+    live_export_state.exporting = True
+    try:
+        bpy.ops.object.raw_export()
+    except RuntimeError as error:
+        print("Live export failed:", error)
+    finally:
+        live_export_state.exporting = False
+    return None
+
+
+@bpy.app.handlers.persistent
+def on_load_post(*args) -> None:
+    """Objects pending from the previous file are gone (or others of the
+    same name)."""
+    live_export_state.pending.clear()
+
+
+def update_live_export(self, context: bpy.types.Context) -> None:
+    if not self.rxm_live_export:
+        live_export_state.pending.clear()
+
+###########################################################################
+
+
 CLASSES_FOR_REGISTRATION = [
     ObjectPointer,
     RawExportEphemeralStore,
     OBJECT_OP_raw_export,
+    OBJECT_OP_raw_export_modal,
     OBJECT_OP_raw_export_export_object,
     OBJECT_OP_raw_export_export_collection,
     OBJECT_OP_raw_export_export_all,
@@ -841,10 +1251,217 @@ def register():
     bpy.types.Object.rxm_export = bpy.props.BoolProperty(name="Export")
     bpy.types.Collection.rxm_sub_dir_path = bpy.props.StringProperty(name="Sub-Dir Path")
     bpy.types.Collection.rxm_export = bpy.props.BoolProperty(name="Export")
+    bpy.types.Collection.rxm_quantize = bpy.props.BoolProperty(
+        name="Quantize",
+        description=(
+            "Encode the attributes of objects in this collection and its "
+            "sub-collections more compactly in the binary formats"
+        )
+    )
+    bpy.types.Collection.rxm_position_encoding = bpy.props.EnumProperty(
+        name="Positions",
+        items=[
+            ("FLOAT32", "Float32", "Full single precision"),
+            ("FLOAT16", "Float16", "Half precision floats"),
+            ("GRID", "Grid", "Integers on a grid of the given precision, spanning the object's bounds"),
+        ],
+        default="GRID"
+    )
+    bpy.types.Collection.rxm_position_precision = bpy.props.FloatProperty(
+        name="Precision",
+        description="Grid size of quantized positions",
+        default=0.001,
+        min=1e-6,
+        precision=6,
+        subtype="DISTANCE"
+    )
+    bpy.types.Collection.rxm_uv_encoding = bpy.props.EnumProperty(
+        name="UVs",
+        items=[
+            ("FLOAT32", "Float32", "Full single precision"),
+            ("FLOAT16", "Float16", "Half precision floats"),
+            ("SNORM16", "SNorm16", "Normalized 16 bit integers, spanning the UV bounds"),
+        ],
+        default="SNORM16"
+    )
+    bpy.types.Collection.rxm_normal_encoding = bpy.props.EnumProperty(
+        name="Normals",
+        items=[
+            ("FLOAT32", "Float32", "Full single precision"),
+            ("OCTAHEDRAL", "Octahedral", "Two normalized 16 bit integers per normal"),
+        ],
+        default="OCTAHEDRAL"
+    )
     bpy.types.Scene.directory = bpy.props.StringProperty(name="Directory", subtype="DIR_PATH")
+    bpy.types.Scene.rxm_output_format = bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ("JSON", "JSON", "Everything as JSON text (.rxm.json)"),
+            ("BINARY", "Binary", "JSON header and little-endian buffers in one file (.rxmb)"),
+            ("BINARY_SIDECAR", "Binary (Sidecar)", "JSON header (.rxm.json) with the buffers in a .bin file next to it"),
+        ],
+        default="JSON"
+    )
+    bpy.types.Scene.rxm_compression = bpy.props.EnumProperty(
+        name="Compression",
+        description=f"Compress into files Godot opens with `FileAccess.open_compressed` ({RXM_COMPRESSED_FILE_SUFFIX})",
+        items=[
+            ("NONE", "None", "Uncompressed"),
+            ("DEFLATE", "Deflate", "zlib"),
+            ("GZIP", "Gzip", "zlib, with gzip headers"),
+            ("ZSTD", "Zstd", "Zstandard (needs the zstandard module)"),
+        ],
+        default="NONE"
+    )
+    bpy.types.Scene.rxm_compression_level = bpy.props.IntProperty(
+        name="Level",
+        description=f"Compression level (Deflate and Gzip: at most {ZLIB_MAX_LEVEL}, Zstd: at most 22)",
+        default=6,
+        min=1,
+        max=22
+    )
+    bpy.types.Scene.rxm_json_compact = bpy.props.BoolProperty(
+        name="Compact JSON",
+        description="Write JSON without indentation and line breaks"
+    )
+    bpy.types.Scene.rxm_float_digits = bpy.props.IntProperty(
+        name="Float Digits",
+        description="Decimal places of floats written as JSON (0: full precision)",
+        default=0,
+        min=0,
+        max=17
+    )
+    bpy.types.Scene.rxm_indexed = bpy.props.BoolProperty(
+        name="Indexed",
+        description=(
+            "Write each distinct combination of position, normal and UV once "
+            "and reference it by index, instead of repeating it for every face corner"
+        )
+    )
+    bpy.types.Scene.rxm_optimize_vertex_cache = bpy.props.BoolProperty(
+        name="Optimize Vertex Cache",
+        description=(
+            "Reorder the triangles of indexed output for the GPU's vertex "
+            "cache, and the vertices in order of first use"
+        )
+    )
+    bpy.types.Scene.rxm_vertex_cache_size = bpy.props.IntProperty(
+        name="Cache Size",
+        description="Vertices the targeted vertex cache holds",
+        default=16,
+        min=3,
+        max=64
+    )
+    bpy.types.Scene.rxm_tangents = bpy.props.BoolProperty(
+        name="Tangents",
+        description=(
+            "Write MikkTSpace tangents (of the active UV map) for objects "
+            "with a material using a tangent space normal map"
+        )
+    )
+    bpy.types.Scene.rxm_incremental = bpy.props.BoolProperty(
+        name="Incremental",
+        description=(
+            "Skip objects whose geometry, materials and export settings "
+            "haven't changed since they were last exported "
+            f"(tracked in {RXM_MANIFEST_FILE_NAME} in the directory)"
+        )
+    )
+    bpy.types.Scene.rxm_instancing = bpy.props.BoolProperty(
+        name="Instancing",
+        description=(
+            "Write the geometry of objects sharing a mesh, materials and "
+            "settings (and without modifiers) once. The others get a small "
+            "file referencing it, along with their transform"
+        )
+    )
+    bpy.types.Scene.rxm_pack = bpy.props.BoolProperty(
+        name="Pack",
+        description=(
+            "Also pack the exported files into one archive in the export "
+            "directory, which Godot loads with random access to each of "
+            "them (RawExport.RawPack). Exports update the entries of their "
+            "objects; entries of objects whose files are gone are dropped"
+        )
+    )
+    bpy.types.Scene.rxm_pack_file_name = bpy.props.StringProperty(
+        name="Pack File Name",
+        description="File name of the pack, without the " + RXM_PACK_FILE_SUFFIX + " suffix",
+        default="parts"
+    )
+    bpy.types.Scene.rxm_export_workers = bpy.props.IntProperty(
+        name="Workers",
+        description=(
+            "Threads encoding and writing files while the next objects are "
+            "extracted (0: one per CPU). Compression and binary files are "
+            "written in parallel, JSON encoding and vertex cache "
+            "optimization hardly speed up with more than one"
+        ),
+        default=0,
+        min=0
+    )
+    bpy.types.Scene.rxm_memory_limit = bpy.props.IntProperty(
+        name="Memory Limit (MiB)",
+        description=(
+            "When Blender's resident memory exceeds this between objects, wait "
+            "for pending files to be written and release their data before "
+            "continuing (0: no limit)"
+        ),
+        default=0,
+        min=0
+    )
+    bpy.types.Scene.rxm_profile = bpy.props.BoolProperty(
+        name="Profile",
+        description=(
+            "Record time and peak allocations of each export phase per object, "
+            f"into {RXM_PROFILE_FILE_NAME} in the directory. Writes files "
+            "without workers, so that phases don't overlap"
+        )
+    )
+    bpy.types.Scene.rxm_profile_cprofile = bpy.props.BoolProperty(
+        name="cProfile",
+        description=f"Dump cProfile stats of the whole export into {RXM_CPROFILE_FILE_NAME} in the directory"
+    )
+    bpy.types.Scene.rxm_modal_export = bpy.props.BoolProperty(
+        name="In Background",
+        description=(
+            "Export a few objects at a time, keeping Blender responsive, with "
+            "the progress in the status bar (Esc cancels)"
+        )
+    )
+    bpy.types.Scene.rxm_modal_time_budget = bpy.props.IntProperty(
+        name="Time Budget (ms)",
+        description="How long to export at a time before letting Blender handle its UI",
+        default=50,
+        min=1
+    )
+    bpy.types.Scene.rxm_live_export = bpy.props.BoolProperty(
+        name="Live",
+        description=(
+            "Re-export objects with a filename whenever their geometry or "
+            "materials change, once edits pause for the given delay"
+        ),
+        update=update_live_export
+    )
+    bpy.types.Scene.rxm_live_export_delay = bpy.props.FloatProperty(
+        name="Delay",
+        description="Seconds without further changes before a live export",
+        default=0.5,
+        min=0.05,
+        subtype="TIME_ABSOLUTE",
+        unit="TIME_ABSOLUTE"
+    )
     bpy.types.WindowManager.ephemeral_store = bpy.props.PointerProperty(type=RawExportEphemeralStore)
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update_post)
+    bpy.app.handlers.load_post.append(on_load_post)
 
 
 def unregister():
+    if on_depsgraph_update_post in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update_post)
+    if on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_post)
+    if bpy.app.timers.is_registered(live_export_timer):
+        bpy.app.timers.unregister(live_export_timer)
     for cls in CLASSES_FOR_REGISTRATION:
         bpy.utils.unregister_class(cls)
@@ -0,0 +1,2212 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2023 Aziroshin (Christian Knuchel)
+"""Everything of the exporter that works without Blender: the exported data,
+its encodings and the writing of files. Imports without `bpy`, so it can be
+benchmarked outside of Blender (see `dev/raw_export_core_benchmark.py`)."""
+import hashlib
+import io
+import json
+import os
+import pprint
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+from abc import abstractmethod, ABC
+from array import array
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from json import JSONEncoder
+from pathlib import Path
+from typing import List, Dict, TypeVar, Literal, TypeAlias, TypedDict, \
+    NamedTuple, Any, Tuple, Callable, TextIO, Iterable, Iterator
+
+# Bundled with Blender.
+import numpy as np
+try:
+    import zstandard
+except ImportError:
+    # Not bundled with Blender, so the ZSTD compression is unavailable
+    # unless it's installed into Blender's Python.
+    zstandard = None
+try:
+    import psutil
+except ImportError:
+    # Not bundled with Blender either; `/proc` is read instead where there
+    # is one.
+    psutil = None
+try:
+    import fcntl
+except ImportError:
+    # Windows, where `msvcrt` locks files instead.
+    fcntl = None
+    import msvcrt
+try:
+    from mathutils import Vector
+except ImportError:
+    # Outside of Blender. A thin stand-in, as vectors are only ever
+    # iterated or indexed in here.
+    class Vector(tuple):
+        pass
+
+T = TypeVar("T")
+
+###########################################################################
+# Config
+###########################################################################
+DEVFIXTURE_output_path = "../../../../assets/parts/raw_export_test_cube.json"
+DEVFIXTURE_debugging_cube = False
+###########################################################################
+
+
+class FractionalListSplitError(Exception):
+    pass
+
+
+def get_equally_split_list(unsplit_list: list[T], part_len: int) -> list[list[T]]:
+    part_count = len(unsplit_list)
+    if not part_count % part_len == 0:
+        raise FractionalListSplitError(
+            "The number of items in unsplit_list (%s) is not a multiple "
+            "of part_len (%s)." % (part_count, part_len)
+        )
+    part_group_count = int(part_count / part_len)
+    return [
+        unsplit_list[part_len*g:part_len*g+part_len]
+        for g in range(part_group_count)
+    ]
+
+
+class JSONSerializable:
+    # TODO: Might want to make this an OrderedDict, so the
+    #   resulting JSON is always the same, no matter what.
+    @abstractmethod
+    def __to_json_serializable__(self):
+        pass
+
+
+def get_vector_json_serializable(vector: Vector) -> Tuple[float, ...]:
+    # Works for 2D, 3D and 4D vectors alike.
+    return tuple(vector)
+
+
+def get_method_json_serializable(item: JSONSerializable) -> Any:
+    return item.__to_json_serializable__()
+
+
+JSON_NATIVE_TYPES = (str, int, float, bool, type(None))
+
+
+class AllJSONEncoders(JSONEncoder):
+    """Encodes what `JSONEncoder` can't by dispatching on the type of the
+    item: `Vector`s become lists and `JSONSerializable`s are encoded by
+    their `__to_json_serializable__`. The converter for a type is looked up
+    once (along its MRO) and cached, so encoding doesn't rely on raised
+    exceptions to find the right one.
+    Before encoding, the whole object graph is converted to plain JSON
+    types in one pass, which spares `JSONEncoder` a `default` call per
+    `Vector`."""
+    # Converters in here have to return plain JSON types.
+    type_converters: Dict[type, Callable[[Any], Any]] = {
+        Vector: get_vector_json_serializable,
+    }
+    # Filled lazily by `get_converter`, with `None` for unsupported types.
+    # Bounded by the number of types ever encoded.
+    _converter_cache: Dict[type, Callable[[Any], Any] | None] = {}
+
+    @classmethod
+    def get_converter(cls, item_type: type) -> Callable[[Any], Any] | None:
+        try:
+            return cls._converter_cache[item_type]
+        except KeyError:
+            pass
+
+        converter = None
+        for base_type in item_type.__mro__:
+            if base_type in cls.type_converters:
+                converter = cls.type_converters[base_type]
+                break
+        if converter is None and hasattr(item_type, "__to_json_serializable__"):
+            converter = get_method_json_serializable
+
+        cls._converter_cache[item_type] = converter
+        return converter
+
+    def get_json_compatible(self, item: Any) -> Any:
+        item_type = type(item)
+        if item_type in JSON_NATIVE_TYPES:
+            return item
+        if item_type is dict:
+            return {key: self.get_json_compatible(value) for key, value in item.items()}
+        if item_type is list or item_type is tuple:
+            return [self.get_json_compatible(value) for value in item]
+
+        converter = self.get_converter(item_type)
+        if converter is None:
+            # Left to `JSONEncoder`, and to `default` after that.
+            return item
+        if converter is get_method_json_serializable:
+            return self.get_json_compatible(converter(item))
+        return converter(item)
+
+    def iterencode(self, item, _one_shot=False):
+        return super().iterencode(self.get_json_compatible(item), _one_shot)
+
+    def default(self, item):
+        converter = self.get_converter(type(item))
+        if converter is None:
+            # Raises the usual `TypeError`.
+            return super().default(item)
+        return converter(item)
+
+
+MaterialDataTypeStr: TypeAlias = Literal[
+    "DEFAULT",
+    "BASIC",
+    "IMAGE_FILES"
+]
+
+
+# TODO: Add a __repr__.
+class MaterialData(ABC, JSONSerializable):
+    type: MaterialDataTypeStr
+    index: int
+    name: str
+
+
+class DefaultMaterialData(MaterialData):
+
+    def __init__(self, index: int):
+        self.type = "DEFAULT"
+        self.index = index
+        self.name = "Default"
+
+    def __to_json_serializable__(self):
+        return {
+            "index": self.index,
+            "type": self.type,
+            "name": self.name,
+        }
+
+
+class BasicMaterialData(MaterialData):
+    color: Vector
+
+    def __init__(self, index: int, name: str, color: Vector):
+        self.type = "BASIC"
+        self.index = index
+        self.name = name
+        self.color = color
+
+    def __to_json_serializable__(self):
+        return {
+            "index": self.index,
+            "type": self.type,
+            "name": self.name,
+            "color": self.color
+        }
+
+
+class ImageTextureMaterialData(MaterialData):
+    filenames: List[str]
+
+    def __init__(self, index: int, name: str, filenames: List[str] = []):
+        self.type = "IMAGE_FILES"
+        self.index = index
+        self.name = name
+        self.filenames = filenames
+
+    def add_file_name(self, filename: str) -> None:
+        self.filenames.append(filename)
+
+    def __to_json_serializable__(self):
+        return {
+            "index": self.index,
+            "type": self.type,
+            "name": self.name,
+            "filenames": self.filenames
+        }
+
+
+class DebugCubeTriDict(TypedDict):
+    axis: Literal["x", "y", "z"]
+    axis_sign: Literal["+", "-"]
+    vertices: List[Vector]
+    uvs: List[Vector]
+    material_index: int
+
+
+class DebugCubeFaceDict(TypedDict):
+    tris: List[DebugCubeTriDict]
+
+
+class DebugCubeSideDict(TypedDict):
+    faces_match: bool
+    faces: List[DebugCubeFaceDict]
+
+
+class AxisSignInfo(NamedTuple):
+    axis: Literal["x", "y", "z"]
+    sign: Literal["+", "-"]
+
+
+def get_cube_same_sign_axis_info(vectors: List[Vector]) -> AxisSignInfo:
+    """Determines axis and sign of a test cube side by a list of vectors.
+    This strictly assumes a cube centered on the world origin with each side
+    being made up of two triangles. Behaviour outside these parameters is
+    undefined."""
+
+    axes: List[Literal["x"], Literal["y"], Literal["z"]] = ["x", "y", "z"]
+    columns: List[List[float]] = [
+        [vectors[0][0], vectors[1][0], vectors[2][0]],
+        [vectors[0][1], vectors[1][1], vectors[2][1]],
+        [vectors[0][2], vectors[1][2], vectors[2][2]]
+    ]
+
+    i_axes = 0
+    for column in columns:
+        if all(map(lambda component: component > 0, column)):
+            return AxisSignInfo(axes[i_axes], "+")
+        elif all(map(lambda component: component < 0, column)):
+            return AxisSignInfo(axes[i_axes], "-")
+        i_axes += 1
+
+
+def generate_cube_debug_side_list(pre_json: Dict) -> List[DebugCubeSideDict]:
+    sides: List[DebugCubeSideDict] = []
+    pre_json_vertices: List[Vector] = pre_json["vertices"]
+    pre_json_uvs: List[Vector] = pre_json["uvs"]
+    pre_json_material_indices: List[int] = pre_json["material_indices"]
+    vertex_count = len(pre_json_vertices)
+
+    if not vertex_count % 6 == 0:
+        raise TypeError(
+            "Number of vertices must be divisible by 6, "
+            "as one side consists of two tris (with two overlapping)."
+        )
+
+    side_count = int(vertex_count / 6)
+    for i_side in range(side_count):
+        verts: List[Vector] = [pre_json_vertices[6*i_side+i] for i in range(6)]
+        uvs: List[Vector] = [pre_json_uvs[6*i_side+i] for i in range(6)]
+        material_indices = [pre_json_material_indices[2*i_side+i] for i in range(2)]
+        print(i_side)
+        tri1_axis_sign_info: AxisSignInfo =\
+            get_cube_same_sign_axis_info(verts[:3])
+        tri2_axis_sign_info: AxisSignInfo =\
+            get_cube_same_sign_axis_info(verts[3:])
+
+        sides.append({
+                "faces_match": tri1_axis_sign_info == tri1_axis_sign_info,
+                "faces": [
+                    {
+                        "axis": tri1_axis_sign_info.axis,
+                        "axis_sign": tri1_axis_sign_info.sign,
+                        "vertices": verts[:3],
+                        "uvs": uvs[:3],
+                        "material_index": material_indices[0]
+                    },
+                    {
+                        "axis": tri2_axis_sign_info.axis,
+                        "axis_sign": tri2_axis_sign_info.sign,
+                        "vertices": verts[3:],
+                        "uvs": uvs[3:],
+                        "material_index": material_indices[1]
+                    },
+                ]
+        })
+
+    return sides
+
+
+class ObjectData:
+    """Flat, typed attribute buffers of an object: 3 floats per vertex for
+    `vertices` and `normals`, 2 for `uvs`, and one material index per face.
+    Optionally 4 floats per vertex for `tangents`: the tangent, followed by
+    the sign of the bitangent (bitangent = sign * cross(normal, tangent)).
+    Without `indices`, there's one vertex per face corner, in face order;
+    with them, `indices` holds one vertex index per face corner instead.
+    Preallocated, so they can be filled in place."""
+    __slots__ = (
+        "vertices",
+        "normals",
+        "uvs",
+        "tangents",
+        "indices",
+        "material_indices",
+        "poly_size"
+    )
+    # Per vertex buffers and their floats per vertex.
+    VERTEX_ATTRIBUTES = (("vertices", 3), ("normals", 3), ("uvs", 2), ("tangents", 4))
+    vertices: array
+    normals: array
+    uvs: array
+    tangents: array
+    indices: array
+    material_indices: array
+    poly_size: int
+
+    def __init__(
+            self,
+            *,
+            vertex_count: int = 0,
+            face_count: int = 0,
+            index_count: int = 0,
+            poly_size: int = -1,
+            has_tangents: bool = False
+    ):
+        self.vertices = array("f", [0.0]) * (vertex_count * 3)
+        self.normals = array("f", [0.0]) * (vertex_count * 3)
+        self.uvs = array("f", [0.0]) * (vertex_count * 2)
+        self.tangents = array("f", [0.0]) * (vertex_count * 4 if has_tangents else 0)
+        self.indices = array("i", [0]) * index_count
+        self.material_indices = array("i", [0]) * face_count
+        self.poly_size = poly_size
+
+    @property
+    def has_tangents(self) -> bool:
+        return len(self.tangents) > 0
+
+    def get_vertex_attributes(self) -> List[Tuple[str, int]]:
+        """Those of `VERTEX_ATTRIBUTES` `self` has."""
+        return [
+            (name, row_len) for name, row_len in self.VERTEX_ATTRIBUTES
+            if name != "tangents" or self.has_tangents
+        ]
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.vertices) // 3
+
+    @property
+    def is_indexed(self) -> bool:
+        return len(self.indices) > 0
+
+    @property
+    def corner_count(self) -> int:
+        return len(self.indices) if self.is_indexed else self.vertex_count
+
+    @property
+    def face_count(self) -> int:
+        return len(self.material_indices)
+
+    def set_corner(
+            self,
+            i_corner: int,
+            vertex: Iterable[float],
+            normal: Iterable[float],
+            uv: Iterable[float] | None
+    ) -> None:
+        i_vec3 = 3 * i_corner
+        self.vertices[i_vec3], self.vertices[i_vec3+1], self.vertices[i_vec3+2]\
+            = vertex
+        self.normals[i_vec3], self.normals[i_vec3+1], self.normals[i_vec3+2]\
+            = normal
+        if uv is not None:
+            self.uvs[2*i_corner], self.uvs[2*i_corner+1] = uv
+
+    def get_pre_json(self) -> Dict[str, List]:
+        """The buffers as the nested lists the JSON schema expects."""
+        return {
+            "vertices": get_equally_split_list(self.vertices.tolist(), 3),
+            "normals": get_equally_split_list(self.normals.tolist(), 3),
+            "uvs": get_equally_split_list(self.uvs.tolist(), 2),
+            **({"tangents": get_equally_split_list(self.tangents.tolist(), 4)} if self.has_tangents else {}),
+            "indices": self.indices.tolist(),
+            "material_indices": self.material_indices.tolist(),
+        }
+
+ARRAY_TYPECODE_DTYPES: Dict[str, np.dtype] = {
+    "i": np.dtype(np.int32),
+    "f": np.dtype(np.float32),
+}
+
+
+def get_buffer_view(buffer: array, row_len: int = 1) -> np.ndarray:
+    """A writable NumPy view onto `buffer`, with `row_len` columns."""
+    view = np.frombuffer(buffer, dtype=ARRAY_TYPECODE_DTYPES[buffer.typecode])
+    return view if row_len == 1 else view.reshape(-1, row_len)
+
+
+def get_indexed_object_data(object_data: ObjectData) -> ObjectData:
+    """Deduplicates the face corners of `object_data`, putting each distinct
+    combination of position, normal, UV, tangent (and material) into the
+    vertex table once and referencing it by index. Vertices keep the order
+    of their first use."""
+    if object_data.is_indexed:
+        return object_data
+
+    vertex_attributes = object_data.get_vertex_attributes()
+    # The material index, then the vertex attributes, one column each.
+    column_count = 1 + sum(row_len for _, row_len in vertex_attributes)
+    corners = np.zeros((object_data.vertex_count, column_count), dtype=np.float32)
+    if object_data.poly_size > 0:
+        # Corners of different materials never share a vertex, so the
+        # vertices of each submesh form a contiguous range.
+        corners[:, 0] = np.repeat(
+            get_buffer_view(object_data.material_indices),
+            object_data.poly_size
+        ).view(np.float32)
+    column = 1
+    for name, row_len in vertex_attributes:
+        corners[:, column:column+row_len] = get_buffer_view(getattr(object_data, name), row_len)
+        column += row_len
+    # One opaque value per corner, so corners are compared bitwise.
+    corner_keys = np.ascontiguousarray(corners).view(
+        np.dtype((np.void, corners.itemsize * column_count))
+    ).ravel()
+    _, first_corners, corner_vertices = np.unique(
+        corner_keys,
+        return_index=True,
+        return_inverse=True
+    )
+    first_use_order = np.argsort(first_corners, kind="stable")
+    vertex_index_remap = np.empty_like(first_use_order)
+    vertex_index_remap[first_use_order] = np.arange(len(first_use_order))
+
+    indexed_object_data = ObjectData(
+        vertex_count=len(first_corners),
+        face_count=object_data.face_count,
+        index_count=object_data.vertex_count,
+        poly_size=object_data.poly_size,
+        has_tangents=object_data.has_tangents
+    )
+    vertices = corners[first_corners[first_use_order]]
+    column = 1
+    for name, row_len in vertex_attributes:
+        get_buffer_view(getattr(indexed_object_data, name), row_len)[:] = vertices[:, column:column+row_len]
+        column += row_len
+    get_buffer_view(indexed_object_data.indices)[:] = vertex_index_remap[corner_vertices.ravel()]
+    indexed_object_data.material_indices = array("i", object_data.material_indices)
+    return indexed_object_data
+
+
+def get_corner_loop_indices(
+        loop_starts: np.ndarray,
+        loop_totals: np.ndarray
+) -> np.ndarray:
+    """Maps each face corner (in face order) to its index in `Mesh.loops`.
+    Loops are usually stored face by face already, but that's not something
+    the API promises, hence the explicit mapping."""
+    corner_offsets = np.cumsum(loop_totals) - loop_totals
+    return np.repeat(loop_starts - corner_offsets, loop_totals)\
+        + np.arange(int(loop_totals.sum()), dtype=np.int64)
+
+
+def get_corner_normals(mesh: "bpy.types.Mesh") -> np.ndarray:
+    """3 floats per loop. `Mesh.corner_normals` since Blender 4.1, the
+    normals of the loops (as calculated along with tangents) before."""
+    corner_normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):
+        mesh.corner_normals.foreach_get("vector", corner_normals)
+    else:
+        mesh.loops.foreach_get("normal", corner_normals)
+    return corner_normals
+
+
+def fill_corners(
+        object_data: ObjectData,
+        mesh: "bpy.types.Mesh",
+        corner_loops: np.ndarray
+) -> None:
+    """Gathers position, normal, UV (and tangent, if `object_data` has
+    tangents) of each face corner, given as its index in `Mesh.loops`,
+    straight into the buffers of `object_data`. Tangents have to be
+    calculated (`Mesh.calc_tangents`) beforehand. Along with them, the
+    normals are those of the corners (split normals) they were calculated
+    against, rather than those of the vertices, so the two stay orthogonal
+    at sharp edges and on flat shaded faces."""
+    vertex_count = len(mesh.vertices)
+    loop_count = len(mesh.loops)
+
+    positions = np.empty(vertex_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    vertex_normals = np.empty(vertex_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("normal", vertex_normals)
+
+    loop_vertex_indices = np.empty(loop_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertex_indices)
+    loop_uvs = np.zeros(loop_count * 2, dtype=np.float32)
+    uv_layer: "bpy.types.MeshUVLoopLayer" = mesh.uv_layers.active
+    if uv_layer is not None:
+        uv_layer.data.foreach_get("uv", loop_uvs)
+
+    corner_vertices = loop_vertex_indices[corner_loops]
+
+    # Views onto the `ObjectData` buffers, so `take` writes right into them.
+    np.take(
+        positions.reshape(-1, 3),
+        corner_vertices,
+        axis=0,
+        out=get_buffer_view(object_data.vertices, 3)
+    )
+    if object_data.has_tangents:
+        np.take(
+            get_corner_normals(mesh).reshape(-1, 3),
+            corner_loops,
+            axis=0,
+            out=get_buffer_view(object_data.normals, 3)
+        )
+    else:
+        np.take(
+            vertex_normals.reshape(-1, 3),
+            corner_vertices,
+            axis=0,
+            out=get_buffer_view(object_data.normals, 3)
+        )
+    np.take(
+        loop_uvs.reshape(-1, 2),
+        corner_loops,
+        axis=0,
+        out=get_buffer_view(object_data.uvs, 2)
+    )
+
+    if object_data.has_tangents:
+        tangents = np.empty(loop_count * 3, dtype=np.float32)
+        mesh.loops.foreach_get("tangent", tangents)
+        bitangent_signs = np.empty(loop_count, dtype=np.float32)
+        mesh.loops.foreach_get("bitangent_sign", bitangent_signs)
+        loop_tangents = np.empty((loop_count, 4), dtype=np.float32)
+        loop_tangents[:, 0:3] = tangents.reshape(-1, 3)
+        loop_tangents[:, 3] = bitangent_signs
+        np.take(
+            loop_tangents,
+            corner_loops,
+            axis=0,
+            out=get_buffer_view(object_data.tangents, 4)
+        )
+
+
+def extract_object_data(mesh: "bpy.types.Mesh", poly_size: int) -> ObjectData:
+    """Reads positions, normals, UVs and material indices of `mesh` in bulk
+    via `foreach_get`, producing the same attributes the BMesh-based
+    `extract_object_data_bmesh` produces, without a per-corner Python loop.
+    Faces are kept as they are, so unless all of them have `poly_size`
+    corners, the `poly_size` of the result is -1.
+    Only uses `mesh` through `foreach_get`, so stand-ins can take its place
+    outside of Blender."""
+    face_count = len(mesh.polygons)
+    object_data = ObjectData(
+        vertex_count=len(mesh.loops),
+        face_count=face_count,
+        poly_size=poly_size
+    )
+
+    loop_starts = np.empty(face_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(face_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    mesh.polygons.foreach_get("material_index", object_data.material_indices)
+    if not (loop_totals == poly_size).all():
+        object_data.poly_size = -1
+
+    fill_corners(object_data, mesh, get_corner_loop_indices(loop_starts, loop_totals))
+    return object_data
+
+
+def extract_triangulated_object_data(mesh: "bpy.types.Mesh", tangents: bool = False) -> ObjectData:
+    """Like `extract_object_data`, but triangulates quads and n-gons the
+    way Blender does for drawing (`Mesh.loop_triangles`), so the result is
+    an exact triangle list, with one material index per triangle.
+    With `tangents`, MikkTSpace tangents of the active UV map are included
+    (raising a `RuntimeError` if there is none)."""
+    mesh.calc_loop_triangles()
+    if tangents:
+        mesh.calc_tangents()
+    triangle_count = len(mesh.loop_triangles)
+    object_data = ObjectData(
+        vertex_count=3 * triangle_count,
+        face_count=triangle_count,
+        poly_size=3,
+        has_tangents=tangents
+    )
+
+    triangle_loops = np.empty(3 * triangle_count, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("loops", triangle_loops)
+    mesh.loop_triangles.foreach_get("material_index", object_data.material_indices)
+
+    fill_corners(object_data, mesh, triangle_loops)
+    return object_data
+
+
+###########################################################################
+# Binary format
+#
+# Layout, with everything little-endian and in the spirit of GLB:
+#   Magic: b"RXMB", u32: version, u32: total byte length,
+#   u32: byte length of the JSON header, b"JSON", the header (UTF-8, padded
+#   with spaces to a multiple of 4),
+#   u32: byte length of the buffer, b"BIN\0", the buffer.
+# In the sidecar variant, the header is a plain JSON file with the buffer
+# written to the file referenced by the "uri" of its only buffer.
+###########################################################################
+OutputFormatStr: TypeAlias = Literal[
+    "JSON",
+    "BINARY",
+    "BINARY_SIDECAR"
+]
+
+RXM_BINARY_MAGIC = b"RXMB"
+# 2: Accessors may be quantized (see "Quantization" below).
+RXM_BINARY_VERSION = 2
+RXM_BINARY_FILE_SUFFIX = ".rxmb"
+RXM_BINARY_SIDECAR_SUFFIX = ".bin"
+RXM_BINARY_CHUNK_TYPE_JSON = b"JSON"
+RXM_BINARY_CHUNK_TYPE_BIN = b"BIN\0"
+
+
+# OpenGL enum values, as used by glTF.
+class ComponentTypes:
+    INT16 = 5122
+    UINT16 = 5123
+    INT32 = 5124
+    UINT32 = 5125
+    FLOAT32 = 5126
+    # Not part of glTF, but GL_HALF_FLOAT.
+    FLOAT16 = 5131
+
+
+ARRAY_TYPECODE_COMPONENT_TYPES: Dict[str, int] = {
+    "i": ComponentTypes.INT32,
+    "f": ComponentTypes.FLOAT32,
+}
+
+DTYPE_COMPONENT_TYPES: Dict[np.dtype, int] = {
+    np.dtype(np.int16): ComponentTypes.INT16,
+    np.dtype(np.uint16): ComponentTypes.UINT16,
+    np.dtype(np.int32): ComponentTypes.INT32,
+    np.dtype(np.uint32): ComponentTypes.UINT32,
+    np.dtype(np.float32): ComponentTypes.FLOAT32,
+    np.dtype(np.float16): ComponentTypes.FLOAT16,
+}
+
+
+def get_padded_bytes(data: bytes, alignment: int = 4, padding: bytes = b"\0") -> bytes:
+    return data + padding * (-len(data) % alignment)
+
+
+def get_little_endian_bytes(buffer: array) -> bytes:
+    if sys.byteorder == "little":
+        return buffer.tobytes()
+    swapped_buffer = array(buffer.typecode, buffer)
+    swapped_buffer.byteswap()
+    return swapped_buffer.tobytes()
+
+
+def get_rxm_binary_parts(
+        object_data: ObjectData,
+        materials: List[MaterialData],
+        buffer_uri: str | None = None,
+        quantized_attributes: Dict[str, "QuantizedAttribute"] | None = None
+) -> Tuple[Dict[str, Any], bytes]:
+    """Lays the buffers of `object_data` out back to back, glTF-style, and
+    returns the header describing them along with the buffer itself.
+    Attributes in `quantized_attributes` are written in their encoded form,
+    with their dequantization parameters added to their accessor."""
+    quantized_attributes = quantized_attributes or {}
+    accessor_types = {
+        "vertices": "VEC3",
+        "normals": "VEC3",
+        "uvs": "VEC2",
+        "indices": "SCALAR",
+        "material_indices": "SCALAR",
+    }
+    if object_data.has_tangents:
+        accessor_types["tangents"] = "VEC4"
+    component_counts = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+
+    buffer_parts: List[bytes] = []
+    buffer_views: List[Dict[str, int]] = []
+    accessors: List[Dict[str, Any]] = []
+    attributes: Dict[str, int] = {}
+    byte_offset = 0
+    for name, accessor_type in accessor_types.items():
+        accessor: Dict[str, Any] = {"bufferView": len(buffer_views), "type": accessor_type}
+        if name in quantized_attributes:
+            quantized_attribute = quantized_attributes[name]
+            encoded = quantized_attribute.data
+            unpadded_data = encoded.astype(encoded.dtype.newbyteorder("<"), copy=False).tobytes()
+            accessor["componentType"] = DTYPE_COMPONENT_TYPES[encoded.dtype]
+            accessor["count"] = len(encoded)
+            accessor.update(quantized_attribute.dequantization)
+        else:
+            attribute_buffer: array = getattr(object_data, name)
+            unpadded_data = get_little_endian_bytes(attribute_buffer)
+            accessor["componentType"] = ARRAY_TYPECODE_COMPONENT_TYPES[attribute_buffer.typecode]
+            accessor["count"] = len(attribute_buffer) // component_counts[accessor_type]
+        data = get_padded_bytes(unpadded_data)
+        buffer_parts.append(data)
+        buffer_views.append({
+            "buffer": 0,
+            "byteOffset": byte_offset,
+            "byteLength": len(unpadded_data),
+        })
+        attributes[name] = len(accessors)
+        accessors.append(accessor)
+        byte_offset += len(data)
+
+    buffer = {"byteLength": byte_offset}
+    if buffer_uri is not None:
+        buffer["uri"] = buffer_uri
+
+    header = {
+        "format": "RXMB",
+        "version": RXM_BINARY_VERSION,
+        "poly_size": object_data.poly_size,
+        "buffers": [buffer],
+        "bufferViews": buffer_views,
+        "accessors": accessors,
+        "attributes": attributes,
+        "materials": materials,
+        **get_object_bounds(object_data),
+    }
+    return header, b"".join(buffer_parts)
+
+
+def get_rxm_binary_file_bytes(header: Dict[str, Any], body: bytes) -> bytes:
+    header_bytes = get_padded_bytes(
+        json.dumps(header, cls=AllJSONEncoders, separators=(",", ":")).encode("utf-8"),
+        padding=b" "
+    )
+    body = get_padded_bytes(body)
+    total_byte_length = 12 + 8 + len(header_bytes) + 8 + len(body)
+    return b"".join((
+        RXM_BINARY_MAGIC,
+        struct.pack("<II", RXM_BINARY_VERSION, total_byte_length),
+        struct.pack("<I", len(header_bytes)),
+        RXM_BINARY_CHUNK_TYPE_JSON,
+        header_bytes,
+        struct.pack("<I", len(body)),
+        RXM_BINARY_CHUNK_TYPE_BIN,
+        body,
+    ))
+
+
+def get_json_less_path(file_path: str) -> str:
+    return file_path[:-len(".json")] if file_path.endswith(".json") else file_path
+
+
+def get_rxm_binary_file_path(file_path: str) -> str:
+    """E.g. `window.rxm.json` -> `window.rxmb`."""
+    json_less_path = get_json_less_path(file_path)
+    if json_less_path.endswith(".rxm"):
+        json_less_path = json_less_path[:-len(".rxm")]
+    return json_less_path + RXM_BINARY_FILE_SUFFIX
+
+
+def get_rxm_binary_sidecar_path(file_path: str) -> str:
+    """E.g. `window.rxm.json` -> `window.rxm.bin`."""
+    return get_json_less_path(file_path) + RXM_BINARY_SIDECAR_SUFFIX
+
+
+###########################################################################
+# Submeshes and bounds
+#
+# Faces are grouped by material index before anything else is done to
+# them, so each material's faces, and their vertices, form one contiguous
+# range (a submesh). Every file describes its submeshes along with its
+# bounds, all in the object's local space:
+#   "aabb": {"min": [x, y, z], "max": [x, y, z]},
+#   "bounding_sphere": {"center": [x, y, z], "radius": r},
+#   "submeshes": [{"material_index", "face_start", "face_count",
+#       "vertex_start", "vertex_count", "aabb", "bounding_sphere"}, ...]
+# The corners (indices, or vertices without indices) of a submesh are
+# those of its faces, i.e. `face_start * poly_size` onwards.
+###########################################################################
+def get_material_ranges(material_indices: np.ndarray) -> List[Tuple[int, int, int]]:
+    """(material index, start, end) of each run of equal values."""
+    if len(material_indices) == 0:
+        return []
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(material_indices)) + 1))
+    ends = np.concatenate((starts[1:], [len(material_indices)]))
+    return [
+        (int(material_indices[start]), int(start), int(end))
+        for start, end in zip(starts, ends)
+    ]
+
+
+def get_material_sorted_object_data(object_data: ObjectData) -> ObjectData:
+    """Groups the faces of `object_data` by material index, keeping their
+    order otherwise."""
+    material_indices = get_buffer_view(object_data.material_indices)
+    poly_size = object_data.poly_size
+    if poly_size <= 0 or (np.diff(material_indices) >= 0).all():
+        return object_data
+
+    face_order = np.argsort(material_indices, kind="stable")
+    corner_order = (face_order[:, None] * poly_size + np.arange(poly_size)).ravel()
+    if object_data.is_indexed:
+        sorted_object_data = ObjectData(
+            face_count=object_data.face_count,
+            index_count=len(object_data.indices),
+            poly_size=poly_size
+        )
+        for name, _ in object_data.get_vertex_attributes():
+            setattr(sorted_object_data, name, array("f", getattr(object_data, name)))
+        get_buffer_view(sorted_object_data.indices)[:] = get_buffer_view(object_data.indices)[corner_order]
+    else:
+        sorted_object_data = ObjectData(
+            vertex_count=object_data.vertex_count,
+            face_count=object_data.face_count,
+            poly_size=poly_size,
+            has_tangents=object_data.has_tangents
+        )
+        for name, row_len in object_data.get_vertex_attributes():
+            get_buffer_view(getattr(sorted_object_data, name), row_len)[:]\
+                = get_buffer_view(getattr(object_data, name), row_len)[corner_order]
+    get_buffer_view(sorted_object_data.material_indices)[:] = material_indices[face_order]
+    return sorted_object_data
+
+
+def get_bounds(positions: np.ndarray) -> Dict[str, Any]:
+    """AABB and bounding sphere of `positions` (one row each). The sphere is
+    centered on the AABB, which is never far from the smallest one for the
+    compact parts this exports, and cheap."""
+    if len(positions) == 0:
+        return {
+            "aabb": {"min": [0.0] * 3, "max": [0.0] * 3},
+            "bounding_sphere": {"center": [0.0] * 3, "radius": 0.0},
+        }
+    positions = positions.astype(np.float64)
+    minimum = positions.min(axis=0)
+    maximum = positions.max(axis=0)
+    center = (minimum + maximum) / 2
+    return {
+        "aabb": {"min": minimum.tolist(), "max": maximum.tolist()},
+        "bounding_sphere": {
+            "center": center.tolist(),
+            "radius": float(np.sqrt(((positions - center) ** 2).sum(axis=1).max())),
+        },
+    }
+
+
+def get_object_bounds(object_data: ObjectData) -> Dict[str, Any]:
+    """The bounds and submeshes of material sorted `object_data` (see
+    above), ready to be added to the header."""
+    positions = get_buffer_view(object_data.vertices, 3)
+    poly_size = max(object_data.poly_size, 1)
+    submeshes = []
+    for material_index, face_start, face_end in get_material_ranges(
+            get_buffer_view(object_data.material_indices)
+    ):
+        corners = slice(face_start * poly_size, face_end * poly_size)
+        if object_data.is_indexed:
+            vertex_indices = get_buffer_view(object_data.indices)[corners]
+            vertex_start = int(vertex_indices.min())
+            vertex_end = int(vertex_indices.max()) + 1
+            submesh_positions = positions[vertex_indices]
+        else:
+            vertex_start, vertex_end = corners.start, corners.stop
+            submesh_positions = positions[corners]
+        submeshes.append({
+            "material_index": material_index,
+            "face_start": face_start,
+            "face_count": face_end - face_start,
+            "vertex_start": vertex_start,
+            "vertex_count": vertex_end - vertex_start,
+            **get_bounds(submesh_positions),
+        })
+    return {**get_bounds(positions), "submeshes": submeshes}
+
+
+###########################################################################
+# Vertex cache optimization
+#
+# Reorders the triangles of indexed output for the GPU's post-transform
+# vertex cache with Tipsify (Sander, Nehab and Barczak: "Fast Triangle
+# Reordering for Vertex Locality and Reduced Overdraw", 2007), then
+# renumbers the vertices in order of first use, for fetch locality.
+# Measured by simulating a FIFO cache of the same size:
+#   ACMR: Average cache miss ratio, vertex shader runs per triangle
+#       (0.5 at best for large regular meshes, 3 at worst).
+#   ATVR: Average transformed vertex ratio, vertex shader runs per vertex
+#       (1 at best).
+###########################################################################
+class VertexCacheStats(NamedTuple):
+    acmr_before: float
+    atvr_before: float
+    acmr_after: float
+    atvr_after: float
+
+
+def get_vertex_cache_misses(indices: List[int], cache_size: int) -> int:
+    """Cache misses of drawing `indices` with a FIFO cache."""
+    # A vertex is still in the cache if fewer than `cache_size` misses
+    # happened since it was last loaded.
+    loaded_at: Dict[int, int] = {}
+    misses = 0
+    for index in indices:
+        if misses - loaded_at.get(index, -cache_size - 1) > cache_size:
+            loaded_at[index] = misses
+            misses += 1
+    return misses
+
+
+def get_tipsified_triangles(triangles: np.ndarray, vertex_count: int, cache_size: int) -> np.ndarray:
+    """The order to draw the rows of `triangles` (vertex index triples) in,
+    as triangle indices."""
+    triangle_count = len(triangles)
+    # Triangles using each vertex, as `adjacent[starts[v]:starts[v + 1]]`.
+    corner_order = np.argsort(triangles.ravel(), kind="stable")
+    adjacent = (corner_order // 3).tolist()
+    starts = np.concatenate(
+        ([0], np.cumsum(np.bincount(triangles.ravel(), minlength=vertex_count)))
+    ).tolist()
+    corners = triangles.tolist()
+
+    live = [starts[v + 1] - starts[v] for v in range(vertex_count)]
+    cache_time = [0] * vertex_count
+    emitted = [False] * triangle_count
+    dead_ends: List[int] = []
+    order: List[int] = []
+    time_stamp = cache_size + 1
+    cursor = 0
+    fanning = 0 if vertex_count > 0 else -1
+
+    while fanning >= 0:
+        candidates = set()
+        for triangle in adjacent[starts[fanning]:starts[fanning + 1]]:
+            if emitted[triangle]:
+                continue
+            emitted[triangle] = True
+            order.append(triangle)
+            for vertex in corners[triangle]:
+                dead_ends.append(vertex)
+                candidates.add(vertex)
+                live[vertex] -= 1
+                if time_stamp - cache_time[vertex] > cache_size:
+                    cache_time[vertex] = time_stamp
+                    time_stamp += 1
+
+        # Next, fan around the candidate that will still be in the cache
+        # once its remaining triangles are emitted, the oldest one first.
+        fanning = -1
+        best_priority = -1
+        for vertex in candidates:
+            if live[vertex] > 0:
+                priority = 0
+                if time_stamp - cache_time[vertex] + 2 * live[vertex] <= cache_size:
+                    priority = time_stamp - cache_time[vertex]
+                if priority > best_priority:
+                    best_priority = priority
+                    fanning = vertex
+        if fanning >= 0:
+            continue
+
+        # Dead end: Continue with a recently used vertex, or any vertex
+        # with triangles left.
+        while dead_ends:
+            vertex = dead_ends.pop()
+            if live[vertex] > 0:
+                fanning = vertex
+                break
+        else:
+            while cursor < vertex_count:
+                if live[cursor] > 0:
+                    fanning = cursor
+                    break
+                cursor += 1
+
+    return np.array(order, dtype=np.int64)
+
+
+def get_vertex_cache_optimized_object_data(
+        object_data: ObjectData,
+        cache_size: int
+) -> Tuple[ObjectData, VertexCacheStats | None]:
+    """Reorders the triangles and vertices of indexed `object_data` (see
+    above), within the range of each material, so submeshes stay intact.
+    Anything else is returned as it is, without stats."""
+    if not object_data.is_indexed or object_data.poly_size != 3:
+        return object_data, None
+
+    vertex_count = object_data.vertex_count
+    triangle_count = object_data.face_count
+    triangles = get_buffer_view(object_data.indices, 3)
+    misses_before = get_vertex_cache_misses(object_data.indices.tolist(), cache_size)
+
+    triangle_order = np.concatenate([
+        start + get_tipsified_triangles(triangles[start:end], vertex_count, cache_size)
+        for _, start, end in get_material_ranges(get_buffer_view(object_data.material_indices))
+    ] or [np.empty(0, dtype=np.int64)])
+    reordered_triangles = triangles[triangle_order]
+    # Vertices in the order of their first use, unused ones last.
+    first_uses = np.full(vertex_count, len(object_data.indices), dtype=np.int64)
+    np.minimum.at(first_uses, reordered_triangles.ravel(), np.arange(len(object_data.indices)))
+    vertex_order = np.argsort(first_uses, kind="stable")
+    vertex_index_remap = np.empty(vertex_count, dtype=np.int32)
+    vertex_index_remap[vertex_order] = np.arange(vertex_count, dtype=np.int32)
+
+    optimized_object_data = ObjectData(
+        vertex_count=vertex_count,
+        face_count=triangle_count,
+        index_count=len(object_data.indices),
+        poly_size=3,
+        has_tangents=object_data.has_tangents
+    )
+    for name, row_len in object_data.get_vertex_attributes():
+        get_buffer_view(getattr(optimized_object_data, name), row_len)[:]\
+            = get_buffer_view(getattr(object_data, name), row_len)[vertex_order]
+    get_buffer_view(optimized_object_data.indices, 3)[:] = vertex_index_remap[reordered_triangles]
+    get_buffer_view(optimized_object_data.material_indices)[:] = get_buffer_view(object_data.material_indices)[triangle_order]
+
+    misses_after = get_vertex_cache_misses(optimized_object_data.indices.tolist(), cache_size)
+    return optimized_object_data, VertexCacheStats(
+        acmr_before=misses_before / max(triangle_count, 1),
+        atvr_before=misses_before / max(vertex_count, 1),
+        acmr_after=misses_after / max(triangle_count, 1),
+        atvr_after=misses_after / max(vertex_count, 1)
+    )
+
+
+###########################################################################
+# Quantization
+#
+# Optional, smaller encodings of the float attributes for the binary
+# formats. An encoded accessor names its encoding in "encoding" and carries
+# what it takes to decode it:
+#   "FLOAT16": Half floats, as they are.
+#   "GRID": Unsigned integers; position = offset + value * scale.
+#   "SNORM16": Signed 16 bit integers; value / 32767 (clamped to -1) is
+#       mapped back with offset + normalized * scale.
+#   "OCTAHEDRAL": Unit vectors as two SNORM16 components of their
+#       octahedral projection, decoded without offset and scale.
+# The accessor "type" stays that of the decoded attribute.
+# JSON output is never quantized (its precision is set by Float Digits).
+###########################################################################
+PositionEncodingStr: TypeAlias = Literal["FLOAT32", "FLOAT16", "GRID"]
+UVEncodingStr: TypeAlias = Literal["FLOAT32", "FLOAT16", "SNORM16"]
+NormalEncodingStr: TypeAlias = Literal["FLOAT32", "OCTAHEDRAL"]
+
+SNORM16_MAX = 32767
+
+
+class Quantization(NamedTuple):
+    """How the attributes of an object are encoded. `position_precision`
+    is the grid size, in Blender units, of the "GRID" position encoding."""
+    positions: PositionEncodingStr = "FLOAT32"
+    position_precision: float = 0.001
+    uvs: UVEncodingStr = "FLOAT32"
+    normals: NormalEncodingStr = "FLOAT32"
+
+
+class QuantizedAttribute(NamedTuple):
+    # Encoded, one row per element.
+    data: np.ndarray
+    # Added to the accessor of the attribute.
+    dequantization: Dict[str, Any]
+    # Largest distance between an original and its decoded element; in
+    # degrees for normals.
+    max_error: float
+
+
+def get_snorm16(normalized: np.ndarray) -> np.ndarray:
+    return np.round(np.clip(normalized, -1.0, 1.0) * SNORM16_MAX).astype(np.int16)
+
+
+def get_snorm16_decoded(encoded: np.ndarray) -> np.ndarray:
+    return np.maximum(encoded.astype(np.float64) / SNORM16_MAX, -1.0)
+
+
+def get_max_distance(originals: np.ndarray, decoded: np.ndarray) -> float:
+    if len(originals) == 0:
+        return 0.0
+    return float(np.max(np.linalg.norm(originals - decoded, axis=1)))
+
+
+def get_normalized(vectors: np.ndarray) -> np.ndarray:
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(lengths > 0.0, lengths, 1.0)
+
+
+def get_octahedral_encoded(normals: np.ndarray) -> np.ndarray:
+    """Projects unit vectors onto the octahedron and unfolds it into the
+    [-1, 1] square."""
+    projected = normals[:, 0:2] / np.maximum(np.sum(np.abs(normals), axis=1), 1e-20)[:, None]
+    signs = np.where(projected >= 0.0, 1.0, -1.0)
+    folded = (1.0 - np.abs(projected[:, ::-1])) * signs
+    return np.where(normals[:, 2:3] < 0.0, folded, projected)
+
+
+def get_octahedral_decoded(encoded: np.ndarray) -> np.ndarray:
+    decoded = np.empty((len(encoded), 3))
+    decoded[:, 0:2] = encoded
+    decoded[:, 2] = 1.0 - np.sum(np.abs(encoded), axis=1)
+    unfold = np.maximum(-decoded[:, 2], 0.0)[:, None]
+    decoded[:, 0:2] -= np.where(decoded[:, 0:2] >= 0.0, unfold, -unfold)
+    return get_normalized(decoded)
+
+
+def get_float16_quantized(values: np.ndarray) -> QuantizedAttribute:
+    encoded = values.astype(np.float16)
+    return QuantizedAttribute(
+        encoded,
+        {"encoding": "FLOAT16"},
+        get_max_distance(values, encoded.astype(np.float64))
+    )
+
+
+def get_grid_quantized(positions: np.ndarray, precision: float) -> QuantizedAttribute:
+    offset = positions.min(axis=0) if len(positions) else np.zeros(3)
+    steps = np.round((positions - offset) / precision)
+    max_step = steps.max() if len(steps) else 0
+    if max_step > np.iinfo(np.uint32).max:
+        raise RawExportError(
+            f"A position precision of {precision} needs more than 32 bits "
+            "for the extent of this object."
+        )
+    encoded = steps.astype(np.uint16 if max_step <= np.iinfo(np.uint16).max else np.uint32)
+    return QuantizedAttribute(
+        encoded,
+        {"encoding": "GRID", "offset": offset.tolist(), "scale": [precision] * 3},
+        get_max_distance(positions, offset + encoded * precision)
+    )
+
+
+def get_snorm16_quantized(values: np.ndarray) -> QuantizedAttribute:
+    """Maps the bounds of `values` onto the full SNORM16 range."""
+    if len(values):
+        lows, highs = values.min(axis=0), values.max(axis=0)
+    else:
+        lows = highs = np.zeros(values.shape[1])
+    offset = (lows + highs) / 2.0
+    scale = np.maximum((highs - lows) / 2.0, 1e-20)
+    encoded = get_snorm16((values - offset) / scale)
+    return QuantizedAttribute(
+        encoded,
+        {"encoding": "SNORM16", "offset": offset.tolist(), "scale": scale.tolist()},
+        get_max_distance(values, offset + get_snorm16_decoded(encoded) * scale)
+    )
+
+
+def get_octahedral_quantized(normals: np.ndarray) -> QuantizedAttribute:
+    normals = get_normalized(normals)
+    encoded = get_snorm16(get_octahedral_encoded(normals))
+    decoded = get_octahedral_decoded(get_snorm16_decoded(encoded))
+    cosines = np.clip(np.sum(normals * decoded, axis=1), -1.0, 1.0)
+    # Zero length normals stay meaningless either way.
+    cosines[np.all(normals == 0.0, axis=1)] = 1.0
+    return QuantizedAttribute(
+        encoded,
+        {"encoding": "OCTAHEDRAL"},
+        float(np.degrees(np.arccos(cosines.min()))) if len(cosines) else 0.0
+    )
+
+
+def get_quantized_attributes(
+        object_data: ObjectData,
+        quantization: Quantization
+) -> Dict[str, QuantizedAttribute]:
+    """Encodes the attributes `quantization` doesn't keep as FLOAT32."""
+    positions = get_buffer_view(object_data.vertices, 3).astype(np.float64)
+    uvs = get_buffer_view(object_data.uvs, 2).astype(np.float64)
+    normals = get_buffer_view(object_data.normals, 3).astype(np.float64)
+
+    quantized_attributes: Dict[str, QuantizedAttribute] = {}
+    if quantization.positions == "FLOAT16":
+        quantized_attributes["vertices"] = get_float16_quantized(positions)
+    elif quantization.positions == "GRID":
+        quantized_attributes["vertices"] = get_grid_quantized(
+            positions,
+            quantization.position_precision
+        )
+    if quantization.uvs == "FLOAT16":
+        quantized_attributes["uvs"] = get_float16_quantized(uvs)
+    elif quantization.uvs == "SNORM16":
+        quantized_attributes["uvs"] = get_snorm16_quantized(uvs)
+    if quantization.normals == "OCTAHEDRAL":
+        quantized_attributes["normals"] = get_octahedral_quantized(normals)
+    return quantized_attributes
+
+
+###########################################################################
+# Streaming JSON
+#
+# Writes the JSON schema straight from the flat `ObjectData` buffers, a
+# chunk of rows at a time, instead of building the whole document (and the
+# nested lists for it) in memory first. With `compact` off and
+# `float_digits` at 0, the output is identical to
+# `json.dumps(..., indent=4)`.
+###########################################################################
+JSON_STREAMING_CHUNK_ROWS = 4096
+JSON_INDENT = "    "
+
+
+def get_json_number_formatter(float_digits: int) -> Callable[[Any], str]:
+    """`float_digits` > 0 rounds floats to that many decimal places,
+    0 keeps them at full (round-trip) precision."""
+    if float_digits > 0:
+        return lambda number: repr(round(number, float_digits))
+    return repr
+
+
+def get_json_numbers(numbers: List, format_number: Callable[[Any], str]) -> List[str]:
+    formatted_numbers = list(map(format_number, numbers))
+    # `repr` spells NaN and infinity differently than JSON does, and only
+    # those spellings contain an "n".
+    if any("n" in number for number in formatted_numbers):
+        return [json.dumps(float(number)) for number in formatted_numbers]
+    return formatted_numbers
+
+
+def write_json_buffer(
+        output_file: TextIO,
+        buffer: array,
+        row_len: int,
+        format_number: Callable[[Any], str],
+        compact: bool,
+        level: int = 1
+) -> None:
+    """Writes `buffer` as a JSON list; of scalars if `row_len` is 1, else of
+    lists of `row_len` numbers each."""
+    if len(buffer) == 0:
+        output_file.write("[]")
+        return
+
+    if compact:
+        item_separator = ","
+        row_start, row_separator, row_end = "[", ",", "]"
+        list_start, list_end = "[", "]"
+        item_indent = ""
+    else:
+        item_indent = JSON_INDENT * (level + 1)
+        item_separator = ",\n"
+        row_start = "[\n" + JSON_INDENT * (level + 2)
+        row_separator = ",\n" + JSON_INDENT * (level + 2)
+        row_end = "\n" + item_indent + "]"
+        list_start, list_end = "[\n", "\n" + JSON_INDENT * level + "]"
+
+    output_file.write(list_start)
+    chunk_len = JSON_STREAMING_CHUNK_ROWS * row_len
+    for chunk_start in range(0, len(buffer), chunk_len):
+        numbers = get_json_numbers(
+            buffer[chunk_start:chunk_start+chunk_len].tolist(),
+            format_number
+        )
+        if row_len == 1:
+            items = numbers
+        else:
+            items = [
+                row_start + row_separator.join(numbers[i:i+row_len]) + row_end
+                for i in range(0, len(numbers), row_len)
+            ]
+        if chunk_start > 0:
+            output_file.write(item_separator)
+        output_file.write(item_separator.join(item_indent + item for item in items))
+    output_file.write(list_end)
+
+
+def write_object_json(
+        output_file: TextIO,
+        object_data: ObjectData,
+        materials: List[MaterialData],
+        compact: bool = False,
+        float_digits: int = 0
+) -> None:
+    format_number = get_json_number_formatter(float_digits)
+    if compact:
+        key_indent, key_separator, item_separator = "", ":", ","
+        object_start, object_end = "{", "}"
+        materials_json = json.dumps(materials, cls=AllJSONEncoders, separators=(",", ":"))
+    else:
+        key_indent, key_separator, item_separator = JSON_INDENT, ": ", ",\n"
+        object_start, object_end = "{\n", "\n}"
+        # JSON strings can't contain raw line breaks, so this only indents.
+        materials_json = json.dumps(materials, cls=AllJSONEncoders, indent=4)\
+            .replace("\n", "\n" + JSON_INDENT)
+
+    buffers = [
+        (name, getattr(object_data, name), row_len)
+        for name, row_len in object_data.get_vertex_attributes()
+    ] + [
+        ("indices", object_data.indices, 1),
+        ("material_indices", object_data.material_indices, 1),
+    ]
+
+    output_file.write(object_start)
+    for name, buffer, row_len in buffers:
+        output_file.write(f'{key_indent}"{name}"{key_separator}')
+        write_json_buffer(output_file, buffer, row_len, format_number, compact)
+        output_file.write(item_separator)
+    output_file.write(f'{key_indent}"materials"{key_separator}{materials_json}')
+    for name, value in get_object_bounds(object_data).items():
+        if compact:
+            value_json = json.dumps(value, separators=(",", ":"))
+        else:
+            value_json = json.dumps(value, indent=4).replace("\n", "\n" + JSON_INDENT)
+        output_file.write(f'{item_separator}{key_indent}"{name}"{key_separator}{value_json}')
+    output_file.write(object_end)
+
+
+###########################################################################
+# Profiling
+###########################################################################
+RXM_PROFILE_FILE_NAME = "rxm_profile.json"
+RXM_CPROFILE_FILE_NAME = "rxm_profile.pstats"
+
+
+class ExportProfiler:
+    """Records the wall time and peak Python allocations (traced by
+    `tracemalloc`, which includes NumPy's) of each export phase, per
+    object. Allocations of overlapping phases can't be told apart, so
+    phases are expected to run one at a time while profiling.
+    A disabled profiler records nothing."""
+    PHASES = (
+        "mesh_evaluation",
+        "attribute_extraction",
+        "material_resolution",
+        "encoding",
+        "file_write",
+    )
+    enabled: bool
+    # Object key -> phase -> "seconds", "peak_bytes".
+    records: Dict[str, Dict[str, Dict[str, float]]]
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.records = {}
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def start(self) -> None:
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def phase(self, key: str, phase_name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        tracemalloc.reset_peak()
+        start_size = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = max(tracemalloc.get_traced_memory()[1] - start_size, 0)
+            with self._lock:
+                record = self.records.setdefault(key, {}).setdefault(
+                    phase_name,
+                    {"seconds": 0.0, "peak_bytes": 0}
+                )
+                record["seconds"] += seconds
+                record["peak_bytes"] = max(record["peak_bytes"], peak_bytes)
+
+    def get_report(self) -> Dict[str, Any]:
+        totals: Dict[str, Dict[str, float]] = {}
+        for phases in self.records.values():
+            for phase_name, record in phases.items():
+                total = totals.setdefault(phase_name, {"seconds": 0.0, "peak_bytes": 0})
+                total["seconds"] += record["seconds"]
+                total["peak_bytes"] = max(total["peak_bytes"], record["peak_bytes"])
+        return {
+            "phases": {name: totals[name] for name in self.PHASES if name in totals},
+            "objects": self.records,
+        }
+
+    def save(self, directory: str) -> Path:
+        report_path = Path(directory) / RXM_PROFILE_FILE_NAME
+        report_path.write_text(json.dumps(self.get_report(), indent=4))
+        return report_path
+
+
+###########################################################################
+# Memory
+###########################################################################
+def get_resident_memory() -> int | None:
+    """Resident memory of this process in bytes, or `None` where it can't
+    be determined (no `psutil` and no `/proc`)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryMonitor:
+    """Samples the resident memory of the process while objects are
+    exported, keeping the peak sampled per object, and tells when it's
+    above `limit_bytes` (0: no limit)."""
+    limit_bytes: int
+    # Object key -> peak resident bytes sampled while exporting it.
+    peaks: Dict[str, int]
+    flush_count: int
+
+    def __init__(self, limit_bytes: int = 0):
+        self.limit_bytes = limit_bytes
+        self.peaks = {}
+        self.flush_count = 0
+
+    def sample(self, key: str) -> int | None:
+        resident = get_resident_memory()
+        if resident is not None:
+            self.peaks[key] = max(resident, self.peaks.get(key, 0))
+        return resident
+
+    def is_exceeded(self) -> bool:
+        if self.limit_bytes <= 0:
+            return False
+        resident = get_resident_memory()
+        return resident is not None and resident > self.limit_bytes
+
+
+###########################################################################
+# Compression
+#
+# Compressed files are written in the format of Godot's
+# `FileAccessCompressed`, so `FileAccess.open_compressed` reads them as
+# they are. Everything little-endian:
+#   Magic: b"GCPF", u32: Godot's compression mode, u32: block size,
+#   u32: uncompressed size,
+#   u32: compressed size of each block (uncompressed size // block size + 1
+#   of them, the last one possibly empty), the compressed blocks.
+###########################################################################
+CompressionStr: TypeAlias = Literal["NONE", "DEFLATE", "GZIP", "ZSTD"]
+
+GODOT_COMPRESSED_MAGIC = b"GCPF"
+# `FileAccess.CompressionMode`.
+GODOT_COMPRESSION_MODES: Dict[CompressionStr, int] = {
+    "DEFLATE": 1,
+    "ZSTD": 2,
+    "GZIP": 3,
+}
+RXM_COMPRESSED_FILE_SUFFIX = ".gcpf"
+RXM_COMPRESSED_BLOCK_SIZE = 1 << 20
+ZLIB_MAX_LEVEL = 9
+
+
+def ensure_compression_available(compression: CompressionStr) -> None:
+    if compression == "ZSTD" and zstandard is None:
+        raise RawExportError(
+            "ZSTD compression needs the `zstandard` module installed "
+            "into Blender's Python."
+        )
+
+
+class GodotCompressedFile(io.BufferedIOBase):
+    """Writable binary file compressing what's written to it block by
+    block. The compressed blocks are kept in memory, as the header needs
+    their sizes, and written out on `close`."""
+    file_path: str
+    compression: CompressionStr
+    uncompressed_size: int
+
+    def __init__(
+            self,
+            file_path: str,
+            compression: CompressionStr,
+            level: int,
+            block_size: int = RXM_COMPRESSED_BLOCK_SIZE
+    ):
+        super().__init__()
+        ensure_compression_available(compression)
+        self.file_path = file_path
+        self.compression = compression
+        self.uncompressed_size = 0
+        self._level = level
+        self._block_size = block_size
+        self._block = bytearray()
+        self._compressed_blocks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def _compress_block(self, block: bytes) -> bytes:
+        if self.compression == "DEFLATE":
+            return zlib.compress(block, min(self._level, ZLIB_MAX_LEVEL))
+        if self.compression == "GZIP":
+            compressor = zlib.compressobj(
+                min(self._level, ZLIB_MAX_LEVEL),
+                zlib.DEFLATED,
+                # With a gzip header and trailer.
+                16 + zlib.MAX_WBITS
+            )
+            return compressor.compress(block) + compressor.flush()
+        return zstandard.ZstdCompressor(level=self._level).compress(block)
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        self._block += data
+        self.uncompressed_size += len(data)
+        while len(self._block) >= self._block_size:
+            self._compressed_blocks.append(
+                self._compress_block(bytes(self._block[:self._block_size]))
+            )
+            del self._block[:self._block_size]
+        return len(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._compressed_blocks.append(self._compress_block(bytes(self._block)))
+        self._block = bytearray()
+        with open(self.file_path, "wb") as output_file:
+            output_file.write(GODOT_COMPRESSED_MAGIC)
+            output_file.write(struct.pack(
+                "<III",
+                GODOT_COMPRESSION_MODES[self.compression],
+                self._block_size,
+                self.uncompressed_size
+            ))
+            for compressed_block in self._compressed_blocks:
+                output_file.write(struct.pack("<I", len(compressed_block)))
+            for compressed_block in self._compressed_blocks:
+                output_file.write(compressed_block)
+        self._compressed_blocks = []
+        super().close()
+
+
+def get_uncompressed_size(file_path: str) -> int:
+    """Of a file, whether it's compressed or not."""
+    with open(file_path, "rb") as input_file:
+        header = input_file.read(16)
+    if file_path.endswith(RXM_COMPRESSED_FILE_SUFFIX) and header[:4] == GODOT_COMPRESSED_MAGIC:
+        return struct.unpack("<I", header[12:16])[0]
+    return os.path.getsize(file_path)
+
+
+class ExportSettings(NamedTuple):
+    """Settings that affect the written output (and nothing else)."""
+    output_format: OutputFormatStr = "JSON"
+    json_compact: bool = False
+    float_digits: int = 0
+    indexed: bool = False
+    # Triangles of indexed output are reordered for a vertex cache of this
+    # size, unless it's 0.
+    vertex_cache_size: int = 0
+    # Per object, from its collections.
+    quantization: Quantization | None = None
+    compression: CompressionStr = "NONE"
+    compression_level: int = 6
+
+
+def get_written_path(file_path: str, settings: ExportSettings) -> str:
+    """Where `file_path` ends up, considering compression."""
+    if settings.compression == "NONE":
+        return file_path
+    return file_path + RXM_COMPRESSED_FILE_SUFFIX
+
+
+def get_output_file_paths(file_path: str, settings: ExportSettings) -> List[str]:
+    """All files `write_object_file` writes for `file_path`."""
+    if settings.output_format == "BINARY":
+        file_paths = [get_rxm_binary_file_path(file_path)]
+    elif settings.output_format == "BINARY_SIDECAR":
+        file_paths = [file_path, get_rxm_binary_sidecar_path(file_path)]
+    else:
+        file_paths = [file_path]
+    return [get_written_path(path, settings) for path in file_paths]
+
+
+def open_output_file(file_path: str, settings: ExportSettings, text: bool) -> io.IOBase:
+    """Opens `file_path` for writing, compressed as per `settings`."""
+    written_path = get_written_path(file_path, settings)
+    if settings.compression == "NONE":
+        return open(written_path, "w+" if text else "wb")
+    compressed_file = GodotCompressedFile(
+        written_path,
+        settings.compression,
+        settings.compression_level
+    )
+    return io.TextIOWrapper(compressed_file, encoding="utf-8") if text else compressed_file
+
+
+class ObjectWriteReport(NamedTuple):
+    file_path: str
+    # Max error per quantized attribute (see `QuantizedAttribute`).
+    quantization_errors: Dict[str, float]
+    # Time spent encoding, compressing and writing.
+    seconds: float
+    uncompressed_size: int
+    written_size: int
+    # Only with `ExportSettings.vertex_cache_size`.
+    vertex_cache_stats: VertexCacheStats | None = None
+
+
+def write_object_file(
+        file_path: str,
+        settings: ExportSettings,
+        object_data: ObjectData,
+        materials: List[MaterialData],
+        profiler: ExportProfiler | None = None
+) -> ObjectWriteReport:
+    start = time.perf_counter()
+    profiler = profiler or ExportProfiler()
+    with profiler.phase(file_path, "encoding"):
+        object_data = get_material_sorted_object_data(object_data)
+        vertex_cache_stats: VertexCacheStats | None = None
+        if settings.indexed:
+            object_data = get_indexed_object_data(object_data)
+            if settings.vertex_cache_size > 0:
+                object_data, vertex_cache_stats = get_vertex_cache_optimized_object_data(
+                    object_data,
+                    settings.vertex_cache_size
+                )
+
+        quantized_attributes: Dict[str, QuantizedAttribute] = {}
+        if settings.quantization is not None and settings.output_format != "JSON":
+            quantized_attributes = get_quantized_attributes(object_data, settings.quantization)
+
+    if settings.output_format == "BINARY":
+        with profiler.phase(file_path, "encoding"):
+            header, body = get_rxm_binary_parts(
+                object_data,
+                materials,
+                quantized_attributes=quantized_attributes
+            )
+            file_bytes = get_rxm_binary_file_bytes(header, body)
+        with profiler.phase(file_path, "file_write"):
+            with open_output_file(get_rxm_binary_file_path(file_path), settings, text=False) as output_file:
+                output_file.write(file_bytes)
+
+    elif settings.output_format == "BINARY_SIDECAR":
+        sidecar_path = get_rxm_binary_sidecar_path(file_path)
+        with profiler.phase(file_path, "encoding"):
+            header, body = get_rxm_binary_parts(
+                object_data,
+                materials,
+                buffer_uri=Path(get_written_path(sidecar_path, settings)).name,
+                quantized_attributes=quantized_attributes
+            )
+            if settings.json_compact:
+                header_json = json.dumps(header, cls=AllJSONEncoders, separators=(",", ":"))
+            else:
+                header_json = json.dumps(header, cls=AllJSONEncoders, indent=4)
+        with profiler.phase(file_path, "file_write"):
+            with open_output_file(sidecar_path, settings, text=False) as output_file:
+                output_file.write(body)
+            with open_output_file(file_path, settings, text=True) as output_file:
+                output_file.write(header_json)
+
+    else:
+        if DEVFIXTURE_debugging_cube and not object_data.is_indexed:
+            debug_print_test_cube({
+                **object_data.get_pre_json(),
+                "materials": materials
+            })
+
+        # The JSON is encoded while it's streamed into the file, so this
+        # includes the encoding.
+        with profiler.phase(file_path, "file_write"):
+            with open_output_file(file_path, settings, text=True) as output_file:
+                write_object_json(
+                    output_file,
+                    object_data,
+                    materials,
+                    compact=settings.json_compact,
+                    float_digits=settings.float_digits
+                )
+
+    output_file_paths = get_output_file_paths(file_path, settings)
+    return ObjectWriteReport(
+        file_path,
+        {name: attribute.max_error for name, attribute in quantized_attributes.items()},
+        time.perf_counter() - start,
+        sum(get_uncompressed_size(path) for path in output_file_paths),
+        sum(os.path.getsize(path) for path in output_file_paths),
+        vertex_cache_stats
+    )
+
+
+###########################################################################
+# Instancing
+#
+# Objects sharing a mesh (and materials and export settings) are written
+# once. The others get an instance record at their path instead, in the
+# container of the output format (JSON text, or RXMB without buffers):
+#   {"instance_of": <written path of the source, relative to the record>,
+#    "transform": <world matrix of the instance, 16 floats, row by row>}
+###########################################################################
+class InstanceReference(NamedTuple):
+    # `file_path` of the object whose files hold the geometry.
+    source_file_path: str
+    transform: Tuple[float, ...]
+
+
+def get_instance_record_path(file_path: str, settings: ExportSettings) -> str:
+    """Where the record of the instance at `file_path` goes, before
+    compression (see `get_written_path`)."""
+    if settings.output_format == "BINARY":
+        return get_rxm_binary_file_path(file_path)
+    return file_path
+
+
+def get_instance_record(
+        file_path: str,
+        settings: ExportSettings,
+        instance: InstanceReference
+) -> Dict[str, Any]:
+    source_path = get_output_file_paths(instance.source_file_path, settings)[0]
+    return {
+        "instance_of": Path(os.path.relpath(
+            source_path,
+            Path(get_written_path(get_instance_record_path(file_path, settings), settings)).parent
+        )).as_posix(),
+        "transform": list(instance.transform),
+    }
+
+
+def get_instance_content_hash(
+        file_path: str,
+        settings: ExportSettings,
+        instance: InstanceReference
+) -> str:
+    content_hash = hashlib.blake2b(digest_size=16)
+    content_hash.update(repr((
+        RXM_MANIFEST_VERSION,
+        tuple(settings),
+        get_instance_record(file_path, settings, instance)
+    )).encode("utf-8"))
+    return content_hash.hexdigest()
+
+
+def write_instance_record(
+        file_path: str,
+        settings: ExportSettings,
+        instance: InstanceReference
+) -> ObjectWriteReport:
+    start = time.perf_counter()
+    record = get_instance_record(file_path, settings, instance)
+    record_path = get_instance_record_path(file_path, settings)
+    if settings.output_format == "BINARY":
+        with open_output_file(record_path, settings, text=False) as output_file:
+            output_file.write(get_rxm_binary_file_bytes(record, b""))
+    else:
+        with open_output_file(record_path, settings, text=True) as output_file:
+            if settings.json_compact:
+                json.dump(record, output_file, separators=(",", ":"))
+            else:
+                json.dump(record, output_file, indent=4)
+    written_path = get_written_path(record_path, settings)
+    return ObjectWriteReport(
+        file_path,
+        {},
+        time.perf_counter() - start,
+        get_uncompressed_size(written_path),
+        os.path.getsize(written_path)
+    )
+
+
+###########################################################################
+# Writing pipeline
+#
+# Extraction needs `bpy`, so it stays on the main thread. What it produces
+# is plain Python data though, so encoding and writing the files is handed
+# off to worker threads, overlapping with the extraction of the next
+# objects (and with each other where the GIL is released, e.g. in file IO).
+###########################################################################
+class ObjectExportJob(NamedTuple):
+    file_path: str
+    settings: ExportSettings
+    object_data: ObjectData
+    materials: List[MaterialData]
+    # Only set for incremental exports.
+    content_hash: str | None = None
+    # Set for instances, which have no `object_data` of their own.
+    instance: InstanceReference | None = None
+
+
+def get_worker_count(requested_worker_count: int) -> int:
+    """`requested_worker_count` <= 0 means one worker per CPU."""
+    if requested_worker_count > 0:
+        return requested_worker_count
+    return os.cpu_count() or 1
+
+
+class ObjectWriterPool:
+    """Writes the files of `ObjectExportJob`s on a pool of worker threads.
+    At most `max_pending` jobs are queued or running at a time; `submit`
+    blocks until there's room, which keeps the memory held by extracted,
+    but not yet written objects bounded.
+
+    Being threads, the workers only run in parallel (with each other and
+    with extraction on the main thread) where the GIL is released: file IO,
+    zlib/zstd compression and the NumPy stages. JSON encoding and Tipsify
+    are pure Python, so JSON and vertex cache optimized exports gain little
+    from more than one worker, see the worker scaling of
+    `dev/raw_export_core_benchmark.py`."""
+    worker_count: int
+    max_pending: int
+    profiler: ExportProfiler | None
+    written: List[ObjectExportJob]
+    reports: List[ObjectWriteReport]
+    errors: List[Tuple[ObjectExportJob, BaseException]]
+
+    def __init__(
+            self,
+            worker_count: int,
+            max_pending: int | None = None,
+            profiler: ExportProfiler | None = None
+    ):
+        self.worker_count = worker_count
+        self.max_pending = 2 * worker_count if max_pending is None else max_pending
+        self.profiler = profiler
+        self.written = []
+        self.reports = []
+        self.errors = []
+        # Without workers, jobs are written in the thread submitting them.
+        self._executor = ThreadPoolExecutor(
+            max_workers=worker_count,
+            thread_name_prefix="raw_export_writer"
+        ) if worker_count > 0 else None
+        self._pending: Dict[Future, ObjectExportJob] = {}
+
+    def _collect(self, futures: Iterable[Future]) -> None:
+        for future in futures:
+            job = self._pending.pop(future)
+            error = future.exception()
+            if error is None:
+                self.written.append(job)
+                self.reports.append(future.result())
+            else:
+                self.errors.append((job, error))
+
+    def _write(self, job: ObjectExportJob) -> ObjectWriteReport:
+        if job.instance is not None:
+            return write_instance_record(job.file_path, job.settings, job.instance)
+        return write_object_file(
+            job.file_path,
+            job.settings,
+            job.object_data,
+            job.materials,
+            self.profiler
+        )
+
+    def submit(self, job: ObjectExportJob) -> None:
+        if self._executor is None:
+            future = Future()
+            try:
+                future.set_result(self._write(job))
+            except Exception as error:
+                future.set_exception(error)
+            self._pending[future] = job
+            self._collect([future])
+            return
+
+        if len(self._pending) >= self.max_pending:
+            done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+            self._collect(done)
+        future = self._executor.submit(self._write, job)
+        self._pending[future] = job
+
+    def flush(self) -> None:
+        """Waits for all submitted jobs to finish, releasing the objects
+        they hold. More jobs can be submitted afterwards."""
+        self._collect(wait(self._pending).done)
+
+    def close(self) -> None:
+        """Waits for all submitted jobs to finish."""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+###########################################################################
+# Incremental export
+###########################################################################
+# Bump whenever the output changes for the same input, so that files
+# written by an older version are never considered up to date.
+RXM_MANIFEST_VERSION = 3
+RXM_MANIFEST_FILE_NAME = ".rxm_manifest.json"
+RXM_MANIFEST_LOCK_FILE_NAME = ".rxm_manifest.lock"
+
+
+@contextmanager
+def locked_file(lock_path: str) -> Iterator[None]:
+    """Holds an exclusive lock on the file at `lock_path` across processes,
+    e.g. Blender processes of a batch export writing to one directory. The
+    OS releases it should the process die while holding it."""
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def get_export_content_hash(
+        object_data: ObjectData,
+        materials: List[MaterialData],
+        settings: ExportSettings
+) -> str:
+    """Hashes everything that ends up in the files of an object."""
+    content_hash = hashlib.blake2b(digest_size=16)
+    content_hash.update(repr((RXM_MANIFEST_VERSION, tuple(settings))).encode("utf-8"))
+    content_hash.update(struct.pack("<i", object_data.poly_size))
+    for buffer in (
+            object_data.vertices,
+            object_data.normals,
+            object_data.uvs,
+            object_data.indices,
+            object_data.material_indices
+    ):
+        content_hash.update(struct.pack("<Q", len(buffer)))
+        content_hash.update(get_little_endian_bytes(buffer))
+    # Only when there are any, so hashes of exports without stay the same.
+    if object_data.has_tangents:
+        content_hash.update(b"tangents")
+        content_hash.update(get_little_endian_bytes(object_data.tangents))
+    content_hash.update(
+        json.dumps(materials, cls=AllJSONEncoders, sort_keys=True).encode("utf-8")
+    )
+    return content_hash.hexdigest()
+
+
+class ExportManifest:
+    """Maps the output paths of exported objects (relative to the export
+    directory) to the content hash they were last written with, so
+    unchanged objects can be skipped. Also keeps count of how many objects
+    were skipped (hits) and written (misses) in the last run.
+    Several processes may export into the same directory at once, so
+    `save` only writes the entries updated by this one into the manifest
+    as it is by then."""
+    directory: Path
+    entries: Dict[str, str]
+    hits: int
+    misses: int
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.entries = self.read_entries()
+        self.hits = 0
+        self.misses = 0
+        self._updated_entries: Dict[str, str] = {}
+
+    def read_entries(self) -> Dict[str, str]:
+        try:
+            manifest = json.loads((self.directory / RXM_MANIFEST_FILE_NAME).read_text())
+        except (OSError, ValueError):
+            # No manifest yet (or a broken one), so everything's a miss.
+            return {}
+        if manifest.get("version") != RXM_MANIFEST_VERSION:
+            return {}
+        return manifest.get("entries", {})
+
+    def get_key(self, file_path: str) -> str:
+        return Path(os.path.relpath(file_path, self.directory)).as_posix()
+
+    def is_up_to_date(self, file_path: str, output_file_paths: List[str], content_hash: str) -> bool:
+        """Whether the files of `file_path` were written with `content_hash`
+        and still exist. Counts as a hit or miss accordingly."""
+        up_to_date = self.entries.get(self.get_key(file_path)) == content_hash\
+            and all(os.path.exists(path) for path in output_file_paths)
+        if up_to_date:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return up_to_date
+
+    def update(self, file_path: str, content_hash: str) -> None:
+        key = self.get_key(file_path)
+        self.entries[key] = self._updated_entries[key] = content_hash
+
+    def save(self) -> None:
+        """Merges the updated entries into the manifest on disk, replacing
+        it at once, so it's never seen half-written."""
+        manifest_path = self.directory / RXM_MANIFEST_FILE_NAME
+        temp_path = str(manifest_path) + f".{os.getpid()}.tmp"
+        with locked_file(str(self.directory / RXM_MANIFEST_LOCK_FILE_NAME)):
+            self.entries = {**self.read_entries(), **self._updated_entries}
+            with open(temp_path, "w+") as manifest_file:
+                json.dump(
+                    {
+                        "version": RXM_MANIFEST_VERSION,
+                        "last_run": {"hits": self.hits, "misses": self.misses},
+                        "entries": dict(sorted(self.entries.items())),
+                    },
+                    manifest_file,
+                    indent=4
+                )
+            os.replace(temp_path, manifest_path)
+
+
+###########################################################################
+# Pack archive
+#
+# The files of many objects in one, so they can be loaded with a single
+# open file and random access. Everything little-endian:
+#   Magic: b"RXMP", u32: version, u32: byte length of the index,
+#   u32: alignment of the entries,
+#   the index (JSON, UTF-8, padded with spaces up to the first entry),
+#   the entries, each starting at a multiple of the alignment.
+# The index: {"entries": {<name>: {"offset", "length", "format",
+# "compressed", "object"}}}, with offsets counting from the start of the
+# pack. Names are the paths of the files relative to the export directory
+# ("/"-separated), and entries are the files byte for byte, so they're
+# read just like the files themselves, and references between them
+# (instance records, sidecar buffers) resolve the same way. "object" is
+# the (pre-format) file path of the object an entry belongs to, so its
+# entries can be replaced as a whole when it's exported again.
+###########################################################################
+PackEntryFormatStr: TypeAlias = Literal["JSON", "BINARY", "BUFFER"]
+
+RXM_PACK_MAGIC = b"RXMP"
+RXM_PACK_VERSION = 1
+RXM_PACK_FILE_SUFFIX = ".rxmpack"
+# Enough for any component type of the buffers in the entries.
+RXM_PACK_ALIGNMENT = 16
+RXM_PACK_HEADER_LEN = 16
+
+
+class PackEntry(NamedTuple):
+    offset: int
+    length: int
+    format: PackEntryFormatStr
+    compressed: bool
+    object: str
+
+
+class PackWriteReport(NamedTuple):
+    file_path: str
+    entry_count: int
+    # Entries of the objects just exported, the others were kept from the
+    # previous pack.
+    updated_count: int
+    written_size: int
+
+
+def get_pack_entry_format(name: str) -> Tuple[PackEntryFormatStr, bool]:
+    """The format of the file named `name`, and whether it's compressed."""
+    compressed = name.endswith(RXM_COMPRESSED_FILE_SUFFIX)
+    if compressed:
+        name = name[:-len(RXM_COMPRESSED_FILE_SUFFIX)]
+    if name.endswith(RXM_BINARY_FILE_SUFFIX):
+        return "BINARY", compressed
+    if name.endswith(RXM_BINARY_SIDECAR_SUFFIX):
+        return "BUFFER", compressed
+    return "JSON", compressed
+
+
+def read_pack_index(pack_path: str) -> Dict[str, PackEntry]:
+    """The entries of the pack at `pack_path`, none if there's no (valid)
+    pack there."""
+    try:
+        with open(pack_path, "rb") as pack_file:
+            magic, version, index_len, _ = struct.unpack("<4sIII", pack_file.read(RXM_PACK_HEADER_LEN))
+            if magic != RXM_PACK_MAGIC or version != RXM_PACK_VERSION:
+                return {}
+            index = json.loads(pack_file.read(index_len))
+    except (OSError, ValueError, struct.error):
+        return {}
+    return {
+        name: PackEntry(
+            entry["offset"],
+            entry["length"],
+            entry["format"],
+            entry["compressed"],
+            entry.get("object", name)
+        )
+        for name, entry in index["entries"].items()
+    }
+
+
+def get_pack_index_bytes(
+        entry_objects_and_lens: Dict[str, Tuple[str, int]],
+        alignment: int = RXM_PACK_ALIGNMENT
+) -> Tuple[bytes, Dict[str, PackEntry]]:
+    """Lays out entries of the given objects and lengths after the index,
+    returning the index (padded up to the first entry) and the entries. As
+    the offsets are part of the index, its length is settled by growing the
+    offsets until the index fits in front of them."""
+    data_start = 0
+    while True:
+        entries: Dict[str, PackEntry] = {}
+        offset = data_start
+        for name, (object_name, length) in entry_objects_and_lens.items():
+            entries[name] = PackEntry(offset, length, *get_pack_entry_format(name), object_name)
+            offset += length + (-length % alignment)
+        index_bytes = json.dumps(
+            {"entries": {name: entry._asdict() for name, entry in entries.items()}},
+            separators=(",", ":")
+        ).encode("utf-8")
+        if RXM_PACK_HEADER_LEN + len(index_bytes) <= data_start:
+            return index_bytes.ljust(data_start - RXM_PACK_HEADER_LEN, b" "), entries
+        unaligned_start = RXM_PACK_HEADER_LEN + len(index_bytes)
+        data_start = unaligned_start + (-unaligned_start % alignment)
+
+
+def write_pack(
+        pack_path: str,
+        directory: str,
+        object_file_paths: Dict[str, List[str]]
+) -> PackWriteReport:
+    """Writes the files of each object (`file_path` -> its output files)
+    into the pack at `pack_path`, named by their path relative to
+    `directory`. Entries of the previous pack there are kept, except for
+    those of the objects given (which might have changed format, say) and
+    those whose file is gone (e.g. deleted along with its object). Entries
+    are copied from the files one at a time, and the pack is replaced only
+    once it's complete."""
+    def get_name(file_path: str) -> str:
+        return Path(os.path.relpath(file_path, directory)).as_posix()
+
+    exported_objects = {get_name(file_path) for file_path in object_file_paths}
+    # Name -> object and file of each entry.
+    sources: Dict[str, Tuple[str, str]] = {
+        name: (entry.object, os.path.join(directory, name))
+        for name, entry in read_pack_index(pack_path).items()
+        if entry.object not in exported_objects
+        and os.path.exists(os.path.join(directory, name))
+    }
+    for file_path, output_file_paths in object_file_paths.items():
+        for output_file_path in output_file_paths:
+            sources[get_name(output_file_path)] = (get_name(file_path), output_file_path)
+    sources = dict(sorted(sources.items()))
+    index_bytes, entries = get_pack_index_bytes({
+        name: (object_name, os.path.getsize(source))
+        for name, (object_name, source) in sources.items()
+    })
+
+    temp_path = pack_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as pack_file:
+            pack_file.write(RXM_PACK_MAGIC)
+            pack_file.write(struct.pack("<III", RXM_PACK_VERSION, len(index_bytes), RXM_PACK_ALIGNMENT))
+            pack_file.write(index_bytes)
+            for name, (_, source) in sources.items():
+                with open(source, "rb") as input_file:
+                    data = input_file.read()
+                if len(data) != entries[name].length:
+                    raise RawExportError(f"Pack entry changed while being packed: {name}")
+                pack_file.write(get_padded_bytes(data, RXM_PACK_ALIGNMENT))
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, pack_path)
+    return PackWriteReport(
+        pack_path,
+        len(entries),
+        sum(len(output_file_paths) for output_file_paths in object_file_paths.values()),
+        os.path.getsize(pack_path)
+    )
+
+
+class RawExportError(Exception):
+    pass
+
+
+def debug_print_test_cube(mesh_pre_json: dict):
+    pprint.pprint(generate_cube_debug_side_list(mesh_pre_json), indent=4)
+    print(mesh_pre_json["material_indices"])